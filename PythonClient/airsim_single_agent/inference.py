@@ -1,24 +1,20 @@
 from cgi import test
 import os
-import gym
-import yaml
+import torch as th
 
 from stable_baselines3 import PPO
-from stable_baselines3.common.monitor import Monitor
-from stable_baselines3.common.vec_env import DummyVecEnv, VecTransposeImage
 
 # Import scripts module to register the custom gym environment
 import scripts
 from scripts.network import NatureCNN
+from scripts.utils import compile_policy, enable_bf16_features, load_yaml, make_vec_env, predict_fast
 
 
 # Load train environment configs
-with open('scripts/env_config.yml', 'r') as f:
-    env_config = yaml.safe_load(f)
+env_config = load_yaml('scripts/env_config.yml')
 
 # Load inference configs
-with open('config.yml', 'r') as f:
-    config = yaml.safe_load(f)
+config = load_yaml('config.yml')
 
 # Model name
 model_name = "best_model"
@@ -26,31 +22,38 @@ model_name = "best_model"
 # Determine input image shape
 image_shape = (84,84,1) if config["test_mode"]=="depth" else (84,84,3)
 
-# Create a DummyVecEnv
-env = DummyVecEnv([lambda: Monitor(
-    gym.make(
-        "airsim-env-v0",
-        ip_address="127.0.0.1",
+
+if __name__ == "__main__":
+    # Create the vectorized env
+    env = make_vec_env(
+        n_envs=config.get("n_envs", 1),
+        vec_env_cls=config.get("vec_env_cls", "dummy"),
         image_shape=image_shape,
         env_config=env_config["TrainEnv"],
-        input_mode=config["train_mode"]
+        input_mode=config["train_mode"],
+        base_port=config.get("base_port", 41451),
+        verbose=config.get("verbose_env", False)
     )
-)])
 
-# Wrap env as VecTransposeImage (Channel last to channel first)
-env = VecTransposeImage(env)
+    policy_kwargs = dict(features_extractor_class=NatureCNN)
+
+    # Load an existing model
+    model = PPO.load(
+        env=env,
+        path=os.path.join("saved_policy", model_name),
+        policy_kwargs=policy_kwargs,
+        device=config.get("device", "mps")
+    )
 
-policy_kwargs = dict(features_extractor_class=NatureCNN)
+    if config.get("bf16_features", False):
+        enable_bf16_features(model)
 
-# Load an existing model
-model = PPO.load(
-    env=env,
-    path=os.path.join("saved_policy", model_name),
-    policy_kwargs=policy_kwargs
-)
+    if config.get("compile_model", False):
+        compile_policy(model, mode=config.get("compile_mode", "reduce-overhead"))
 
-# Run the trained policy
-obs = env.reset()
-for i in range(2300):
-    action, _ = model.predict(obs, deterministic=True)
-    obs, _, dones, info = env.step(action)
+    # Run the trained policy (no autograd bookkeeping for the whole loop)
+    with th.inference_mode():
+        obs = env.reset()
+        for i in range(2300):
+            action = predict_fast(model, obs)
+            obs, _, dones, info = env.step(action)
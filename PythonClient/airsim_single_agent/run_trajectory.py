@@ -9,6 +9,7 @@ import json
 import time
 import sys
 import os
+import math
 import numpy as np
 from pathlib import Path
 
@@ -96,11 +97,11 @@ class TrajectoryRunner:
                     'y': current_pos.y_val,
                     'z': current_pos.z_val
                 },
-                'error': np.linalg.norm([
+                'error': math.hypot(
                     current_pos.x_val - x,
                     current_pos.y_val - y,
                     current_pos.z_val - z
-                ])
+                )
             })
 
             print(f"  Reached: ({current_pos.x_val:.2f}, {current_pos.y_val:.2f}, {current_pos.z_val:.2f}) m")
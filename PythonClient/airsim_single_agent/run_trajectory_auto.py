@@ -9,9 +9,16 @@ import json
 import time
 import sys
 import os
+import math
 import numpy as np
 from pathlib import Path
 
+# orjson is optional: much faster load/dump, falls back to stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 class TrajectoryRunner:
     def __init__(self):
         """Initialize AirSim connection"""
@@ -23,6 +30,8 @@ class TrajectoryRunner:
         self.trajectory_data = None
         self.start_time = None
         self.positions_log = []
+        self._errors = np.empty(0)
+        self._n_errors = 0
 
     def load_trajectory(self, json_file):
         """Load trajectory from JSON file"""
@@ -31,8 +40,18 @@ class TrajectoryRunner:
         if not os.path.exists(json_file):
             raise FileNotFoundError(f"Trajectory file not found: {json_file}")
 
-        with open(json_file, 'r') as f:
-            self.trajectory_data = json.load(f)
+        if orjson is not None:
+            with open(json_file, 'rb') as f:
+                self.trajectory_data = orjson.loads(f.read())
+        else:
+            with open(json_file, 'r') as f:
+                self.trajectory_data = json.load(f)
+
+        # Convert all waypoint positions cm -> m once, as an (N, 3) array
+        self._positions_m = np.asarray([
+            [wp['position'][k] for k in 'xyz']
+            for wp in self.trajectory_data['waypoints']
+        ], dtype=np.float64) / 100.0
 
         print(f"✓ Loaded: {self.trajectory_data['name']}")
         print(f"  Description: {self.trajectory_data['description']}")
@@ -66,14 +85,22 @@ class TrajectoryRunner:
         waypoints = self.trajectory_data['waypoints']
         velocity = self.trajectory_data['velocity']
 
+        # Position errors, filled in place as waypoints are reached
+        self._errors = np.empty(len(waypoints), dtype=np.float64)
+        self._n_errors = 0
+
+        # Positions were converted to meters in load_trajectory
+        positions = self._positions_m.tolist()
+        yaws = [wp.get('yaw', 0) for wp in waypoints]
+
+        # One YawMode per distinct yaw instead of one per waypoint
+        yaw_modes = {yaw: airsim.YawMode(is_rate=False, yaw_or_rate=yaw) for yaw in set(yaws)}
+
         for i, wp in enumerate(waypoints):
             print(f"\n[Waypoint {wp['id']}/{len(waypoints)-1}] {wp['description']}")
 
-            # Extract position (convert cm to meters for AirSim API)
-            x = wp['position']['x'] / 100
-            y = wp['position']['y'] / 100
-            z = wp['position']['z'] / 100
-            yaw = wp.get('yaw', 0)
+            x, y, z = positions[i]
+            yaw = yaws[i]
             wait_time = wp.get('wait_time', 0.5)
 
             print(f"  Target: ({x:.2f}, {y:.2f}, {z:.2f}) m, Yaw: {yaw}°")
@@ -82,11 +109,18 @@ class TrajectoryRunner:
             self.client.moveToPositionAsync(
                 x, y, z,
                 velocity=velocity,
-                yaw_mode=airsim.YawMode(is_rate=False, yaw_or_rate=yaw)
+                yaw_mode=yaw_modes[yaw]
             ).join()
 
             # Log current position
             current_pos = self.client.simGetVehiclePose().position
+            error = math.hypot(
+                current_pos.x_val - x,
+                current_pos.y_val - y,
+                current_pos.z_val - z
+            )
+            self._errors[self._n_errors] = error
+            self._n_errors += 1
             self.positions_log.append({
                 'waypoint_id': wp['id'],
                 'timestamp': time.time() - self.start_time,
@@ -96,15 +130,11 @@ class TrajectoryRunner:
                     'y': current_pos.y_val,
                     'z': current_pos.z_val
                 },
-                'error': np.linalg.norm([
-                    current_pos.x_val - x,
-                    current_pos.y_val - y,
-                    current_pos.z_val - z
-                ])
+                'error': error
             })
 
             print(f"  Reached: ({current_pos.x_val:.2f}, {current_pos.y_val:.2f}, {current_pos.z_val:.2f}) m")
-            print(f"  Position error: {self.positions_log[-1]['error']:.3f} m")
+            print(f"  Position error: {error:.3f} m")
 
             # Check for collision
             collision_info = self.client.simGetCollisionInfo()
@@ -126,12 +156,12 @@ class TrajectoryRunner:
         print("="*60)
 
         # Calculate statistics
-        if len(self.positions_log) > 0:
-            errors = [log['error'] for log in self.positions_log]
+        if self._n_errors > 0:
+            errors = self._errors[:self._n_errors]
             print(f"\nPosition Accuracy:")
-            print(f"  Mean error: {np.mean(errors):.3f} m")
-            print(f"  Max error: {np.max(errors):.3f} m")
-            print(f"  Min error: {np.min(errors):.3f} m")
+            print(f"  Mean error: {errors.mean():.3f} m")
+            print(f"  Max error: {errors.max():.3f} m")
+            print(f"  Min error: {errors.min():.3f} m")
 
             # Save log
             if save_log:
@@ -146,21 +176,28 @@ class TrajectoryRunner:
         traj_name = self.trajectory_data['name'].replace(' ', '_').lower()
         log_file = log_dir / f"{traj_name}_{timestamp}.json"
 
+        errors = self._errors[:self._n_errors]
+
         log_data = {
             'trajectory': self.trajectory_data['name'],
             'timestamp': timestamp,
             'total_time_seconds': time.time() - self.start_time,
             'waypoints': self.positions_log,
             'statistics': {
-                'mean_error_m': float(np.mean([log['error'] for log in self.positions_log])),
-                'max_error_m': float(np.max([log['error'] for log in self.positions_log])),
+                'mean_error_m': errors.mean(),
+                'max_error_m': errors.max(),
                 'waypoints_completed': len(self.positions_log),
                 'waypoints_total': len(self.trajectory_data['waypoints'])
             }
         }
 
-        with open(log_file, 'w') as f:
-            json.dump(log_data, f, indent=2)
+        if orjson is not None:
+            log_file.write_bytes(orjson.dumps(
+                log_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            # np.float64 subclasses float, so stdlib json handles the stats too
+            with open(log_file, 'w') as f:
+                json.dump(log_data, f, indent=2)
 
         print(f"\n✓ Log saved to: {log_file}")
 
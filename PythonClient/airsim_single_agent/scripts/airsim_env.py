@@ -9,25 +9,44 @@ os.environ['KMP_DUPLICATE_LIB_OK']='True'
 
 
 class AirSimDroneEnv(gym.Env):
-    def __init__(self, ip_address, image_shape, env_config, input_mode):
+    def __init__(self, ip_address, image_shape, env_config, input_mode, port=41451,
+                 verbose=False):
         self.image_shape = image_shape
+        self.verbose = verbose
         #self.sections = env_config["sections"]
         self.input_mode = input_mode
 
-        self.drone = airsim.MultirotorClient(ip=ip_address)
+        self.drone = airsim.MultirotorClient(ip=ip_address, port=port)
 
+        # Image requests are identical every step, so build them once
+        self.rgb_image_request = airsim.ImageRequest(
+            0, airsim.ImageType.Scene, False, False)
+        self.depth_image_request = airsim.ImageRequest(
+            1, airsim.ImageType.DepthPerspective, True, False)
+
+        # Observations are channel first (C,H,W) so no VecTransposeImage is needed
         if self.input_mode == "multi_rgb":
             self.observation_space = gym.spaces.Box(
                 low=0, high=255, 
-                shape=(image_shape[0],image_shape[1]*3,1), 
+                shape=(1,image_shape[0],image_shape[1]*3), 
                 dtype=np.uint8)
         else:
             self.observation_space = gym.spaces.Box(
-                low=0, high=255, shape=self.image_shape, dtype=np.uint8)
+                low=0, high=255, 
+                shape=(image_shape[2],image_shape[0],image_shape[1]), 
+                dtype=np.uint8)
 
         self.action_space = gym.spaces.Box(
             low=-3.0, high=3.0, shape=(2,), dtype=np.float32) #0.6
 
+        # Two persistent obs buffers used alternately, so an obs handed out
+        # by step() is not overwritten by the reset() that follows it
+        # (DummyVecEnv keeps it as info["terminal_observation"])
+        self._obs_bufs = [
+            np.empty(self.observation_space.shape, dtype=np.uint8)
+            for _ in range(2)]
+        self._obs_idx = 0
+
         self.info = {"collision": False}
         self.collision_time = 0
         self.random_start = True
@@ -74,7 +93,7 @@ class AirSimDroneEnv(gym.Env):
             np.array([y_pos, z_pos]) - self.target_pos)
 
         if self.input_mode == "multi_rgb":
-            self.obs_stack = np.zeros(self.image_shape)
+            self.obs_stack = np.zeros(self.image_shape, dtype=np.uint8)
 
     def do_action(self, action):
         # Execute action
@@ -86,6 +105,9 @@ class AirSimDroneEnv(gym.Env):
 
     def get_obs(self):
         self.info["collision"] = self.is_collision()
+
+        self._obs_idx ^= 1
+        obs = self._obs_bufs[self._obs_idx]
         
         if self.input_mode == "multi_rgb":
             obs_t = self.get_rgb_image()	
@@ -93,18 +115,21 @@ class AirSimDroneEnv(gym.Env):
             self.obs_stack[:,:,0] = self.obs_stack[:,:,1]
             self.obs_stack[:,:,1] = self.obs_stack[:,:,2]
             self.obs_stack[:,:,2] = obs_t_gray
-            obs = np.hstack((
-                self.obs_stack[:,:,0],
-                self.obs_stack[:,:,1],
-                self.obs_stack[:,:,2]))
-            obs = np.expand_dims(obs, axis=2)
+
+            # Frames side by side, written straight into the obs buffer
+            w = self.image_shape[1]
+            for i in range(3):
+                obs[0,:,i*w:(i+1)*w] = self.obs_stack[:,:,i]
 
         elif self.input_mode == "single_rgb":
-            obs = self.get_rgb_image()
+            np.copyto(obs, self.get_rgb_image().transpose(2,0,1))
 
         elif self.input_mode == "depth":
-            obs = self.get_depth_image(thresh=3.4).reshape(self.image_shape)
-            obs = ((obs/3.4)*255).astype(int)
+            # Single channel, so HWC -> CHW is a plain reshape, no transpose
+            depth = self.get_depth_image(thresh=3.4).reshape(obs.shape)
+            # Keep uint8, NatureCNN scales to [0,1] on the policy device
+            depth *= 255/3.4
+            np.copyto(obs, depth, casting="unsafe")
 	
         return obs, self.info
 
@@ -122,15 +147,16 @@ class AirSimDroneEnv(gym.Env):
         # Vicinity reward
         reward += (self.target_dist_prev/target_dist_curr) #np.exp(-target_dist_curr)*30
 
-        # Debug
-        print("##########################")
-        print("Agents start pos", x, y, z, " and ", self.agent_start_pos)
-        print("Target pos", self.target_pos)
-        print("Distance origin to target", self.target_dist_prev)
-        print("Traveled x", agent_traveled_x)
-        print("Distance x,y to target", target_dist_curr)
-        print("Rewards", reward)
-        print("##########################")
+        # Debug (off by default, a flushed print per line every step adds up)
+        if self.verbose:
+            print("##########################\n"
+                  f"Agents start pos {x} {y} {z}  and  {self.agent_start_pos}\n"
+                  f"Target pos {self.target_pos}\n"
+                  f"Distance origin to target {self.target_dist_prev}\n"
+                  f"Traveled x {agent_traveled_x}\n"
+                  f"Distance x,y to target {target_dist_curr}\n"
+                  f"Rewards {reward}\n"
+                  "##########################")
 
         # Collision penalty
         if self.is_collision():
@@ -149,24 +175,29 @@ class AirSimDroneEnv(gym.Env):
         return True if current_collision_time != self.collision_time else False
     
     def get_rgb_image(self):
-        rgb_image_request = airsim.ImageRequest(
-            0, airsim.ImageType.Scene, False, False)
-        responses = self.drone.simGetImages([rgb_image_request])
-        img1d = np.fromstring(responses[0].image_data_uint8, dtype=np.uint8)
-        img2d = np.reshape(img1d, (responses[0].height, responses[0].width, 3)) 
+        # Uncompressed uint8 request: the payload is raw pixels, no PNG decode
+        responses = self.drone.simGetImages([self.rgb_image_request])
+        img1d = np.frombuffer(responses[0].image_data_uint8, dtype=np.uint8)
 
         # Sometimes no image returns from api
-        try:
-            return img2d.reshape(self.image_shape)
-        except:
-            return np.zeros((self.image_shape))
+        if img1d.size == 0:
+            return np.zeros(self.image_shape, dtype=np.uint8)
+
+        img2d = img1d.reshape(responses[0].height, responses[0].width, 3)
+        if img2d.shape[:2] != self.image_shape[:2]:
+            img2d = cv2.resize(
+                img2d, (self.image_shape[1], self.image_shape[0]),
+                interpolation=cv2.INTER_AREA)
+        return img2d.reshape(self.image_shape)
 
     def get_depth_image(self, thresh = 2.0):
-        depth_image_request = airsim.ImageRequest(
-            1, airsim.ImageType.DepthPerspective, True, False)
-        responses = self.drone.simGetImages([depth_image_request])
-        depth_image = np.array(responses[0].image_data_float, dtype=np.float32)
+        responses = self.drone.simGetImages([self.depth_image_request])
+        depth_image = np.asarray(responses[0].image_data_float, dtype=np.float32)
         depth_image = depth_image.reshape(responses[0].height, responses[0].width)
+        if depth_image.size and depth_image.shape != self.image_shape[:2]:
+            depth_image = cv2.resize(
+                depth_image, (self.image_shape[1], self.image_shape[0]),
+                interpolation=cv2.INTER_AREA)
         depth_image[depth_image>thresh]=thresh
         if len(depth_image) == 0:
             depth_image = np.zeros(self.image_shape)
@@ -180,7 +211,9 @@ class TestEnv(AirSimDroneEnv):
         image_shape, 
         env_config, 
         input_mode, 
-        test_mode
+        test_mode,
+        port=41451,
+        verbose=False
     ):
     
         self.start_pos = -1
@@ -189,7 +222,9 @@ class TestEnv(AirSimDroneEnv):
             ip_address, 
             image_shape, 
             env_config, 
-            input_mode
+            input_mode,
+            port=port,
+            verbose=verbose
         )
         
         self.test_mode = test_mode
@@ -0,0 +1,190 @@
+import os
+import queue
+import time
+import multiprocessing as mp
+
+import numpy as np
+import torch as th
+
+from stable_baselines3.common.callbacks import BaseCallback
+
+
+def _async_eval_worker(snapshots, results, image_shape, env_config,
+                       input_mode, eval_port, n_eval_envs, n_eval_episodes):
+    """
+    Evaluate policy snapshots on a separate AirSim instance.
+
+    Receives (num_timesteps, state_dict_path) from snapshots, loads the
+    weights into a local CPU copy of the policy and sends back
+    (num_timesteps, mean_reward, std_reward). None stops the worker.
+    """
+    from stable_baselines3 import PPO
+    from stable_baselines3.common.evaluation import evaluate_policy
+
+    from scripts.network import NatureCNN
+    from scripts.utils import make_vec_env
+
+    env = make_vec_env(
+        n_envs=n_eval_envs,
+        vec_env_cls="subproc" if n_eval_envs > 1 else "dummy",
+        image_shape=image_shape,
+        env_config=env_config,
+        input_mode=input_mode,
+        base_port=eval_port
+    )
+    model = PPO(
+        'CnnPolicy',
+        env,
+        device="cpu",
+        policy_kwargs=dict(features_extractor_class=NatureCNN)
+    )
+
+    while True:
+        item = snapshots.get()
+        if item is None:
+            break
+
+        num_timesteps, path = item
+        model.policy.load_state_dict(th.load(path, weights_only=True))
+        mean_reward, std_reward = evaluate_policy(
+            model,
+            env,
+            n_eval_episodes=n_eval_episodes,
+            deterministic=True
+        )
+        results.put((num_timesteps, float(mean_reward), float(std_reward)))
+
+    env.close()
+
+
+class AsyncEvalCallback(BaseCallback):
+    """
+    Non-blocking replacement for EvalCallback.
+
+    Every eval_freq steps the current policy weights are written to disk and
+    handed to a worker process that runs evaluate_policy on its own AirSim
+    instance(s) (eval_port, ...), so training keeps stepping while eval episodes run.
+    If the worker is still busy the snapshot is skipped. Results are logged
+    as they come back and the best policy is saved as best_model.zip.
+
+    If the worker dies (e.g. its AirSim connection is lost) evaluation stops
+    with a message and training carries on. At the end of training the last
+    result is awaited for at most result_timeout seconds.
+    """
+    def __init__(
+        self,
+        image_shape,
+        env_config,
+        input_mode,
+        eval_port=41452,
+        n_eval_envs=1,
+        n_eval_episodes=20,
+        eval_freq=2048,
+        best_model_save_path="saved_policy",
+        result_timeout=600.0,
+        verbose=1
+    ):
+        super(AsyncEvalCallback, self).__init__(verbose)
+        self.image_shape = image_shape
+        self.env_config = env_config
+        self.input_mode = input_mode
+        self.eval_port = eval_port
+        self.n_eval_envs = n_eval_envs
+        self.n_eval_episodes = n_eval_episodes
+        self.eval_freq = eval_freq
+        self.best_model_save_path = best_model_save_path
+        self.result_timeout = result_timeout
+
+        self.best_mean_reward = -np.inf
+        self.pending = None
+        self.process = None
+
+    def _init_callback(self):
+        os.makedirs(self.best_model_save_path, exist_ok=True)
+        self.snapshot_path = os.path.join(
+            self.best_model_save_path, "async_eval_snapshot.pth")
+
+        # "spawn" is the only start method that is safe on macOS
+        ctx = mp.get_context("spawn")
+        self.snapshots = ctx.Queue()
+        self.results = ctx.Queue()
+        self.process = ctx.Process(
+            target=_async_eval_worker,
+            args=(
+                self.snapshots,
+                self.results,
+                self.image_shape,
+                self.env_config,
+                self.input_mode,
+                self.eval_port,
+                self.n_eval_envs,
+                self.n_eval_episodes
+            ),
+            # Not a daemon: it may start SubprocVecEnv workers of its own
+            daemon=False
+        )
+        self.process.start()
+
+    def _on_step(self):
+        self._collect_results()
+
+        if (self.n_calls % self.eval_freq == 0 and self.pending is None
+                and self.process.is_alive()):
+            # Only one snapshot in flight, so the file is never overwritten
+            # while the worker may still be reading it
+            th.save(self.model.policy.state_dict(), self.snapshot_path)
+            self.pending = self.num_timesteps
+            self.snapshots.put((self.num_timesteps, self.snapshot_path))
+
+        return True
+
+    def _collect_results(self, block=False):
+        deadline = time.monotonic() + self.result_timeout
+        while self.pending is not None:
+            try:
+                # Blocking waits poll, so a dead worker is noticed
+                num_timesteps, mean_reward, std_reward = self.results.get(
+                    block=block, timeout=1.0 if block else None)
+            except queue.Empty:
+                if not self.process.is_alive():
+                    print(f"Async eval worker exited (exit code {self.process.exitcode}), "
+                          f"no more evaluations will run")
+                    self.pending = None
+                elif block and time.monotonic() > deadline:
+                    print(f"Async eval result for num_timesteps={self.pending} "
+                          f"not received within {self.result_timeout:.0f}s, giving up")
+                    self.pending = None
+                if not block or self.pending is None:
+                    return
+                continue
+
+            self.pending = None
+            self.logger.record("eval/mean_reward", mean_reward)
+            self.logger.record("eval/std_reward", std_reward)
+            self.logger.record("eval/timesteps", num_timesteps)
+
+            if self.verbose > 0:
+                print(f"Async eval num_timesteps={num_timesteps}, "
+                      f"episode_reward={mean_reward:.2f} +/- {std_reward:.2f}")
+
+            if mean_reward > self.best_mean_reward:
+                self.best_mean_reward = mean_reward
+                # The snapshot only holds weights, so save the full model
+                # from the evaluated weights rather than the current ones
+                current = {k: v.clone() for k, v in self.model.policy.state_dict().items()}
+                self.model.policy.load_state_dict(
+                    th.load(self.snapshot_path, weights_only=True))
+                self.model.save(
+                    os.path.join(self.best_model_save_path, "best_model"))
+                self.model.policy.load_state_dict(current)
+                if self.verbose > 0:
+                    print("New best mean reward!")
+
+    def _on_training_end(self):
+        # Wait for the last evaluation so its result is not lost
+        self._collect_results(block=True)
+        self.snapshots.put(None)
+        self.process.join(timeout=30)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
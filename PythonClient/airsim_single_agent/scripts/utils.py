@@ -0,0 +1,131 @@
+import functools
+
+import gym
+import yaml
+import numpy as np
+import torch as th
+
+from stable_baselines3.common.monitor import Monitor
+from stable_baselines3.common.utils import obs_as_tensor
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+
+# libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+
+@functools.lru_cache(maxsize=None)
+def load_yaml(path):
+    """
+    Parse a YAML config file, caching the result per path.
+
+    Callers must treat the returned dict as read-only since it is shared.
+    """
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
+
+def make_env(rank, image_shape, env_config, input_mode,
+             ip_address="127.0.0.1", base_port=41451, verbose=False):
+    """
+    Return a thunk that builds one monitored AirSim env.
+
+    Each rank connects to its own AirSim instance on base_port + rank so
+    that several simulators can step in parallel.
+    """
+    def _init():
+        # Import inside the thunk so subprocess workers register the env
+        import scripts  # noqa: F401
+
+        return Monitor(
+            gym.make(
+                "airsim-env-v0",
+                ip_address=ip_address,
+                port=base_port + rank,
+                image_shape=image_shape,
+                env_config=env_config,
+                input_mode=input_mode,
+                verbose=verbose
+            )
+        )
+    return _init
+
+
+def make_vec_env(n_envs, vec_env_cls, image_shape, env_config, input_mode,
+                 ip_address="127.0.0.1", base_port=41451, verbose=False):
+    """
+    Build a DummyVecEnv or SubprocVecEnv over n_envs AirSim instances.
+
+    vec_env_cls is "dummy" (serial, single process) or "subproc"
+    (one process per env, overlapping simulator RPC with policy forward).
+    """
+    env_fns = [
+        make_env(i, image_shape, env_config, input_mode, ip_address, base_port,
+                 verbose)
+        for i in range(n_envs)
+    ]
+
+    if vec_env_cls == "subproc":
+        # "spawn" is the only start method that is safe on macOS
+        return SubprocVecEnv(env_fns, start_method="spawn")
+    return DummyVecEnv(env_fns)
+
+
+def enable_bf16_features(model):
+    """
+    Run the CNN feature extractor under bfloat16 autocast.
+
+    Weights and optimizer state stay float32; only the conv activations are
+    computed in bf16, and features are cast back to float32 before the MLP
+    heads so the action/value nets and the PPO loss are unaffected.
+    """
+    extractor = model.policy.features_extractor
+    forward = extractor.forward
+    device_type = model.device.type
+
+    def _forward(observations):
+        with th.autocast(device_type=device_type, dtype=th.bfloat16):
+            return forward(observations).float()
+
+    extractor.forward = _forward
+    return model
+
+
+def predict_fast(model, obs):
+    """
+    Deterministic batched actions without building an action distribution.
+
+    Equivalent to model.predict(obs, deterministic=True)[0] for the Box
+    action space used here: the Gaussian mean from action_net, clipped to
+    the action bounds. Call it under torch.inference_mode(), as the
+    inference loop does, so no autograd state is recorded.
+
+    The policy is switched to eval mode first, as predict() does: NatureCNN
+    uses batch norm, which must use its loaded running statistics here.
+    """
+    policy = model.policy
+    policy.set_training_mode(False)
+    obs_t = obs_as_tensor(obs, policy.device)
+    features = policy.extract_features(obs_t)
+    latent_pi, _ = policy.mlp_extractor(features)
+    actions = policy.action_net(latent_pi).cpu().numpy()
+    return np.clip(actions, model.action_space.low, model.action_space.high)
+
+
+def compile_policy(model, mode="reduce-overhead"):
+    """
+    Compile the policy's feature extractor and MLP heads with torch.compile.
+
+    Module.compile() works in place, so parameter names (and therefore saved
+    checkpoints) are unchanged. A dummy predict() traces the graph up front
+    so the first real env step is not slowed down by compilation.
+    """
+    th.set_float32_matmul_precision("high")
+    model.policy.features_extractor.compile(mode=mode)
+    model.policy.mlp_extractor.compile(mode=mode)
+
+    obs = np.stack([model.observation_space.sample() for _ in range(model.n_envs)])
+    model.predict(obs, deterministic=True)
+    return model
@@ -1,87 +1,127 @@
-import gym
+import math
 import time
-import yaml
 
 from stable_baselines3 import PPO
-from stable_baselines3.common.monitor import Monitor
-from stable_baselines3.common.vec_env import DummyVecEnv, VecTransposeImage
 from stable_baselines3.common.evaluation import evaluate_policy
 from stable_baselines3.common.callbacks import EvalCallback
 
 # Import scripts module to register the custom gym environment
 import scripts
 from scripts.network import NatureCNN
+from scripts.callbacks import AsyncEvalCallback
+from scripts.utils import compile_policy, enable_bf16_features, load_yaml, make_vec_env
 
 
 # Load train environment configs
-with open('scripts/env_config.yml', 'r') as f:
-    env_config = yaml.safe_load(f)
+env_config = load_yaml('scripts/env_config.yml')
 
 # Load inference configs
-with open('config.yml', 'r') as f:
-    config = yaml.safe_load(f)
+config = load_yaml('config.yml')
 
 # Determine input image shape
 image_shape = (84,84,1) if config["train_mode"]=="depth" else (84,84,3)
 
-# Create a DummyVecEnv
-env = DummyVecEnv([lambda: Monitor(
-    gym.make(
-        "airsim-env-v0",
-        ip_address="127.0.0.1",
+
+if __name__ == "__main__":
+    # Create the vectorized env (guarded: SubprocVecEnv workers re-import this module)
+    env = make_vec_env(
+        n_envs=config.get("n_envs", 1),
+        vec_env_cls=config.get("vec_env_cls", "dummy"),
         image_shape=image_shape,
         env_config=env_config["TrainEnv"],
-        input_mode=config["train_mode"]
+        input_mode=config["train_mode"],
+        base_port=config.get("base_port", 41451),
+        verbose=config.get("verbose_env", False)
+    )
+
+    policy_kwargs = dict(
+        features_extractor_class=NatureCNN
+    )
+
+    # Keep the rollout at ~2048 transitions in total however many envs run,
+    # rounded up so n_steps * n_envs splits into whole minibatches
+    n_envs = config.get("n_envs", 1)
+    batch_size = config.get("batch_size", 512)
+    step_multiple = batch_size // math.gcd(batch_size, n_envs)
+    n_steps = max(128, 2048 // n_envs)
+    n_steps = -(-n_steps // step_multiple) * step_multiple
+
+    model = PPO(
+        'CnnPolicy', 
+        env, 
+        learning_rate=0.0001,
+        n_steps=n_steps,
+        batch_size=batch_size,
+        n_epochs=10,
+        clip_range=0.10,
+        max_grad_norm=0.5,
+        verbose=1, 
+        seed=1,
+        device=config.get("device", "mps"),
+        tensorboard_log="./tb_logs/",
+        policy_kwargs=policy_kwargs,
+    )
+
+    if config.get("bf16_features", False):
+        enable_bf16_features(model)
+
+    if config.get("compile_model", False):
+        compile_policy(model, mode=config.get("compile_mode", "reduce-overhead"))
+
+    print('==========================================================')
+    print('Model Design:')
+    print(model.policy)
+    print('==========================================================')
+
+    # model = PPO.load(path="best_model.zip", env=env)
+
+    # Separate eval env over n_eval_envs AirSim instances starting at
+    # eval_port, so the 20 eval episodes run n_eval_envs at a time
+    n_eval_envs = config.get("n_eval_envs", 0)
+    if n_eval_envs > 0 and not config.get("async_eval", False):
+        eval_env = make_vec_env(
+            n_envs=n_eval_envs,
+            vec_env_cls=config.get("vec_env_cls", "dummy"),
+            image_shape=image_shape,
+            env_config=env_config["TrainEnv"],
+            input_mode=config["train_mode"],
+            base_port=config.get("eval_port", 41452)
+        )
+    else:
+        eval_env = env
+
+    # Evaluation callback
+    callbacks = []
+    if config.get("async_eval", False):
+        # Evaluate on a second AirSim instance without pausing training
+        eval_callback = AsyncEvalCallback(
+            image_shape=image_shape,
+            env_config=env_config["TrainEnv"],
+            input_mode=config["train_mode"],
+            eval_port=config.get("eval_port", 41452),
+            n_eval_envs=max(n_eval_envs, 1),
+            n_eval_episodes=20,
+            eval_freq=2048,
+            best_model_save_path="saved_policy",
+        )
+    else:
+        eval_callback = EvalCallback(
+            eval_env,
+            callback_on_new_best=None,
+            n_eval_episodes=20,
+            best_model_save_path="saved_policy",
+            log_path=".",
+            eval_freq=2048,
+        )
+
+    callbacks.append(eval_callback)
+    kwargs = {}
+    kwargs["callback"] = callbacks
+
+    log_name = "ppo_run_" + str(time.time())
+
+    model.learn(
+        total_timesteps=350000,
+        tb_log_name=log_name,
+        **kwargs
     )
-)])
-
-# Wrap env as VecTransposeImage (Channel last to channel first)
-env = VecTransposeImage(env)
-
-policy_kwargs = dict(
-    features_extractor_class=NatureCNN
-)
-
-model = PPO(
-    'CnnPolicy', 
-    env, 
-    learning_rate=0.0001,
-    batch_size=128,
-    clip_range=0.10,
-    max_grad_norm=0.5,
-    verbose=1, 
-    seed=1,
-    device="mps",
-    tensorboard_log="./tb_logs/",
-    policy_kwargs=policy_kwargs,
-)
-
-print('==========================================================')
-print('Model Design:')
-print(model.policy)
-print('==========================================================')
-
-# model = PPO.load(path="best_model.zip", env=env)
-
-# Evaluation callback
-callbacks = []
-eval_callback = EvalCallback(
-    env,
-    callback_on_new_best=None,
-    n_eval_episodes=20,
-    best_model_save_path="saved_policy",
-    log_path=".",
-    eval_freq=2048,
-)
-
-callbacks.append(eval_callback)
-kwargs = {}
-kwargs["callback"] = callbacks
-
-log_name = "ppo_run_" + str(time.time())
-
-model.learn(
-    total_timesteps=350000,
-    tb_log_name=log_name,
-    **kwargs
-)
@@ -0,0 +1,70 @@
+"""
+Fast JSON helpers for the visualization scripts.
+
+Uses orjson (C implementation, parses/serializes several times faster) when
+it is installed and falls back to the stdlib json module otherwise, so orjson
+remains an optional dependency.
+"""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    """Serialize NumPy arrays/scalars with the stdlib encoder."""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def loads(data):
+    """Parse JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, indent: bool = False) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes (2-space indent if requested)."""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None, default=_default).encode('utf-8')
+
+
+def load_file(path):
+    """Read and parse a JSON file."""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def _replace_with(path, write):
+    """
+    Write a file atomically: write(f) fills <path>.part, which then replaces path.
+
+    An interrupted write leaves the old file (if any) untouched.
+    """
+    part_path = os.fspath(path) + '.part'
+    try:
+        with open(part_path, 'wb') as f:
+            write(f)
+        os.replace(part_path, path)
+    except BaseException:
+        try:
+            os.remove(part_path)
+        except OSError:
+            pass
+        raise
+
+
+def dump_file(obj, path, indent: bool = False):
+    """Serialize obj and write it to path (atomically)."""
+    data = dumps(obj, indent=indent)
+    _replace_with(path, lambda f: f.write(data))
@@ -0,0 +1,171 @@
+"""
+Path building kernels for the visualization scripts.
+
+Uses a Numba-compiled loop (fuses the delta, scale and running sum into a
+single pass, parallel over agents) when numba is installed and falls back
+to NumPy otherwise, so numba remains an optional dependency. If the
+ahead-of-time module built by build_kernels.py is present it is used first,
+so no JIT compilation happens at startup.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Built by build_kernels.py (optional)
+try:
+    from path_kernels_aot import build_paths_multi as _build_paths_aot
+except ImportError:
+    _build_paths_aot = None
+
+
+def _build_paths_numpy(src, scale, starts):
+    out = np.empty_like(src)
+    out[:, 0] = starts
+    out[:, 1:] = starts[:, None, :] + np.cumsum(np.diff(src, axis=1) * scale, axis=1)
+    return out
+
+
+if njit is not None:
+    # Plain function so build_kernels.py can AOT-compile the same loop
+    def _build_paths_loop(src, scale, starts):
+        n_agents, n = src.shape[0], src.shape[1]
+        out = np.empty_like(src)
+        # Agents are independent, so they are spread across cores
+        for a in prange(n_agents):
+            out[a, 0, 0] = starts[a, 0]
+            out[a, 0, 1] = starts[a, 1]
+            out[a, 0, 2] = starts[a, 2]
+            for i in range(1, n):
+                out[a, i, 0] = out[a, i - 1, 0] + (src[a, i, 0] - src[a, i - 1, 0]) * scale
+                out[a, i, 1] = out[a, i - 1, 1] + (src[a, i, 1] - src[a, i - 1, 1]) * scale
+                out[a, i, 2] = out[a, i - 1, 2] + (src[a, i, 2] - src[a, i - 1, 2]) * scale
+        return out
+
+    _build_paths_numba = njit(cache=True, fastmath=True, parallel=True)(_build_paths_loop)
+
+
+class PathPoint:
+    """
+    Lightweight stand-in for airsim.Vector3r in long path/point lists.
+
+    msgpack-rpc serializes custom objects through their to_msgpack() method,
+    and Vector3r's just returns its __dict__ ({'x_val', 'y_val', 'z_val'}).
+    PathPoint returns the same map, so the RPC payload is identical, but it
+    has no per-instance __dict__. A namedtuple would NOT work: tuples are
+    packed as arrays, not maps.
+    """
+    __slots__ = ('x_val', 'y_val', 'z_val')
+
+    def __init__(self, x_val=0.0, y_val=0.0, z_val=0.0):
+        self.x_val = x_val
+        self.y_val = y_val
+        self.z_val = z_val
+
+    def to_msgpack(self, *args, **kwargs):
+        return {'x_val': self.x_val, 'y_val': self.y_val, 'z_val': self.z_val}
+
+    def __repr__(self):
+        return f"PathPoint({self.x_val}, {self.y_val}, {self.z_val})"
+
+
+def to_path_points(arr):
+    """Convert an (N, 3) array to a list of PathPoint (plain Python floats)."""
+    return [PathPoint(x, y, z) for x, y, z in np.asarray(arr).tolist()]
+
+
+def to_wire_points(arr):
+    """
+    Convert an (N, 3) array to the RPC form of a Vector3r list.
+
+    Each point is the {'x_val', 'y_val', 'z_val'} map a Vector3r/PathPoint
+    serializes to, as a plain dict. msgpack packs dicts in C, so unlike
+    PathPoint no Python to_msgpack() call is made per point when the list
+    is sent. For points that are only sent, never read back as .x_val.
+    """
+    return [{'x_val': x, 'y_val': y, 'z_val': z} for x, y, z in np.asarray(arr).tolist()]
+
+
+def build_paths_multi(src, scale, starts):
+    """
+    Replay the frame-to-frame movement of several agents from new start positions.
+
+    Args:
+        src: (A, N, 3) float64 positions, one row of N frames per agent (N >= 1)
+        scale: Scale factor applied to each movement
+        starts: (A, 3) start positions (first frame of each result row)
+
+    Returns:
+        (A, N, 3) float64 array of absolute positions
+    """
+    src = np.ascontiguousarray(src, dtype=np.float64)
+    starts = np.ascontiguousarray(starts, dtype=np.float64)
+    if _build_paths_aot is not None:
+        return _build_paths_aot(src, float(scale), starts)
+    if njit is not None:
+        return _build_paths_numba(src, float(scale), starts)
+    return _build_paths_numpy(src, scale, starts)
+
+
+def build_paths(src, scale, sx, sy, sz):
+    """
+    Replay the frame-to-frame movement of src from a new start position.
+
+    Args:
+        src: (N, 3) float64 positions (N >= 1)
+        scale: Scale factor applied to each movement
+        sx, sy, sz: Start position (first row of the result)
+
+    Returns:
+        (N, 3) float64 array of absolute positions
+    """
+    return build_paths_multi(np.asarray(src)[None], scale, [[sx, sy, sz]])[0]
+
+
+def simplify_path(points, tolerance):
+    """
+    Drop waypoints that lie within tolerance of the simplified path
+    (Ramer-Douglas-Peucker). The first and last points are always kept.
+
+    Args:
+        points: (N, 3) positions
+        tolerance: Maximum distance (same units) of a dropped point from the
+            segment that replaces it; <= 0 keeps every point
+
+    Returns:
+        (M, 3) float64 array of the kept points, M <= N, in order
+    """
+    pts = np.asarray(points, dtype=np.float64)
+    n = len(pts)
+    if n < 3 or tolerance <= 0:
+        return pts
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    tol_sq = tolerance * tolerance
+
+    # Iterative (no recursion limit on long paths); each step measures all
+    # points of one span against its end-to-end segment in one NumPy pass
+    spans = [(0, n - 1)]
+    while spans:
+        i, j = spans.pop()
+        if j - i < 2:
+            continue
+        rel = pts[i + 1:j] - pts[i]
+        seg = pts[j] - pts[i]
+        seg_sq = seg @ seg
+        if seg_sq > 0:
+            t = np.clip(rel @ seg / seg_sq, 0.0, 1.0)
+            rel = rel - t[:, None] * seg
+        dist_sq = np.einsum('ij,ij->i', rel, rel)
+        k = int(np.argmax(dist_sq))
+        if dist_sq[k] > tol_sq:
+            mid = i + 1 + k
+            keep[mid] = True
+            spans.append((i, mid))
+            spans.append((mid, j))
+
+    return pts[keep]
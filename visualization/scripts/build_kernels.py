@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Ahead-of-time compile the path kernels with numba.pycc.
+
+Builds the path_kernels_aot extension module next to this script.
+_pathkernels imports it in preference to the JIT kernel, so the
+visualization scripts start without any compilation.
+
+Run once after installing the requirements, and again after changing the
+kernel in _pathkernels.py:
+    python build_kernels.py
+
+The build is optional: numba.pycc is pending deprecation in numba, so the
+JIT kernel (and the NumPy fallback without numba) remains the supported
+path. The built extension is a local artifact and is ignored by git.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from numba.pycc import CC
+
+from _pathkernels import _build_paths_loop
+
+cc = CC('path_kernels_aot')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+cc.export('build_paths_multi', 'f8[:,:,:](f8[:,:,:], f8, f8[:,:])')(_build_paths_loop)
+
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"✓ Built path_kernels_aot in {cc.output_dir}")
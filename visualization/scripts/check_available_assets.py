@@ -6,7 +6,11 @@ This script tests spawning various built-in objects to see what's available.
 """
 
 import airsim
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Number of parallel probe connections
+MAX_WORKERS = 8
 
 # Connect
 print("Connecting to AirSim...")
@@ -45,28 +49,50 @@ print("="*60)
 available_assets = []
 unavailable_assets = []
 
-for asset_name in test_assets:
+# An RPC client must not be shared between threads, so each worker
+# thread opens its own connection on first use
+_local = threading.local()
+
+
+def _get_client():
+    if not hasattr(_local, "client"):
+        _local.client = airsim.MultirotorClient()
+    return _local.client
+
+
+def probe_asset(asset_name):
+    """Spawn and immediately destroy one asset, returning (success, error)"""
+    probe_client = _get_client()
     object_name = f"Test_{asset_name}"
     pose = airsim.Pose(airsim.Vector3r(0, 0, -1), airsim.to_quaternion(0, 0, 0))
 
     try:
         # Try spawning with physics disabled for visual-only object
-        success = client.simSpawnObject(object_name, asset_name, pose, 1.0, False)
+        # (simSpawnObject blocks until the actor exists, no sleep needed)
+        success = probe_client.simSpawnObject(object_name, asset_name, pose, 1.0, False)
 
         if success:
-            print(f"✓ {asset_name:20s} - AVAILABLE")
-            available_assets.append(asset_name)
-            time.sleep(0.1)
             # Clean up
-            client.simDestroyObject(object_name)
-        else:
-            print(f"✗ {asset_name:20s} - Not available")
-            unavailable_assets.append(asset_name)
+            probe_client.simDestroyObject(object_name)
+        return success, None
     except Exception as e:
-        print(f"✗ {asset_name:20s} - Error: {str(e)[:40]}")
-        unavailable_assets.append(asset_name)
+        return False, e
+
+
+# Probe all assets concurrently, results come back in test_assets order
+with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(test_assets))) as executor:
+    results = list(executor.map(probe_asset, test_assets))
 
-    time.sleep(0.1)
+for asset_name, (success, error) in zip(test_assets, results):
+    if error is not None:
+        print(f"✗ {asset_name:20s} - Error: {str(error)[:40]}")
+        unavailable_assets.append(asset_name)
+    elif success:
+        print(f"✓ {asset_name:20s} - AVAILABLE")
+        available_assets.append(asset_name)
+    else:
+        print(f"✗ {asset_name:20s} - Not available")
+        unavailable_assets.append(asset_name)
 
 print("="*60)
 print(f"\nSummary:")
@@ -7,9 +7,13 @@ This module handles:
 - Visualization settings
 """
 
+import math
 import numpy as np
 from typing import Tuple, Dict, Any
 
+# Radians to degrees, as a plain float multiply (no ufunc dispatch per call)
+_RAD_TO_DEG = 180.0 / math.pi
+
 
 class VisualizationConfig:
     """Configuration for episode visualization"""
@@ -36,6 +40,7 @@ class VisualizationConfig:
     MIN_DRONE_VELOCITY = 5.0  # m/s - minimum velocity for smooth movement (higher = smoother)
     MOVEMENT_LOOKAHEAD = 1.0  # meters - lookahead distance for path smoothing
     MOVEMENT_TIMEOUT = 1.0  # seconds - timeout for each movement command
+    FLIGHT_PATH_TOLERANCE = 0.05  # meters - drop path waypoints closer than this to the simplified path (0 = keep all)
 
     # Vehicle names (must match settings.json)
     DEFENDER_NAME = "Defender"
@@ -49,9 +54,18 @@ class VisualizationConfig:
     TRAJECTORY_COLOR_ATTACKER = [1.0, 0.0, 0.0, 1.0]  # Red
     TRAJECTORY_COLOR_BASE = [0.0, 0.5, 1.0, 1.0]  # Bright Blue/Cyan
     TRAJECTORY_THICKNESS = 2.0
+    # Live trail segments are drawn once each and not resent. With
+    # TRAJECTORY_TRAIL_PERSISTENT = False every segment fades after
+    # TRAJECTORY_TRAIL_DURATION seconds, so the trail is a tail of the last
+    # few seconds; set it to True to keep the whole flight drawn until reset
+    TRAJECTORY_TRAIL_DURATION = 5.0
+    TRAJECTORY_TRAIL_PERSISTENT = False
+    TRAJECTORY_MAX_DRAW_POINTS = 1000  # Downsample longer trajectory lines when drawing
     BASE_MARKER_SIZE = 20.0  # Size of base marker point
     VEHICLE_MARKER_SIZE = 30.0  # Size of vehicle identification markers
     VEHICLE_MARKER_OFFSET = 0.0  # Height offset from vehicle (0 = exact position)
+    VEHICLE_MARKER_EVERY_N_FRAMES = 1  # Redraw markers every N frames (higher = fewer RPC calls)
+    VEHICLE_LABEL_EVERY_N_FRAMES = 4  # Redraw text labels every N frames (text is costly to render)
 
     # Logging
     LOG_EVERY_N_FRAMES = 10  # Print status every N frames
@@ -92,6 +106,34 @@ def transform_position(pos: list, config: VisualizationConfig = None) -> Tuple[f
     return (x_airsim, y_airsim, z_airsim)
 
 
+def transform_positions_batch(positions, config: VisualizationConfig = None) -> np.ndarray:
+    """
+    Vectorised transform_position for a whole trajectory.
+
+    The transform is one per-axis multiply (scale, with the Z flip folded
+    in) plus the Z offset, so any number of leading axes can be done in a
+    single pass, e.g. (N, 3) or (N, agents, 3).
+
+    Args:
+        positions: (..., 3) array-like of [x, y, z] positions in METERS
+        config: VisualizationConfig instance (uses default if None)
+
+    Returns:
+        (..., 3) float64 array in AirSim coordinates (scaled meters)
+    """
+    if config is None:
+        config = VisualizationConfig()
+
+    scale = config.SCALE_FACTOR
+    factors = np.array([scale, scale, -scale if config.INVERT_Z else scale])
+    out = np.multiply(np.asarray(positions, dtype=np.float64), factors)
+
+    if config.Z_OFFSET:
+        out[..., 2] += config.Z_OFFSET
+
+    return out
+
+
 def transform_orientation(rpy: list) -> Tuple[float, float, float]:
     """
     Transform orientation from training data to AirSim.
@@ -102,14 +144,8 @@ def transform_orientation(rpy: list) -> Tuple[float, float, float]:
     Returns:
         Tuple of (roll, pitch, yaw) in degrees for AirSim
     """
-    roll, pitch, yaw = rpy[0], rpy[1], rpy[2]
-
     # Convert radians to degrees
-    roll_deg = np.degrees(roll)
-    pitch_deg = np.degrees(pitch)
-    yaw_deg = np.degrees(yaw)
-
-    return (roll_deg, pitch_deg, yaw_deg)
+    return (rpy[0] * _RAD_TO_DEG, rpy[1] * _RAD_TO_DEG, rpy[2] * _RAD_TO_DEG)
 
 
 def calculate_velocity_magnitude(vel: list) -> float:
@@ -122,7 +158,29 @@ def calculate_velocity_magnitude(vel: list) -> float:
     Returns:
         Speed in m/s
     """
-    return np.linalg.norm(vel)
+    vx, vy, vz = vel
+    return math.hypot(vx, vy, vz)
+
+
+def downsample_points(points: list, max_points: int) -> list:
+    """
+    Keep every k-th point (plus the last) so at most ~max_points remain.
+
+    Used for trajectory lines, where dropping nearby points is not visible
+    but shrinks the RPC payload.
+
+    Args:
+        points: Sequence of points
+        max_points: Target maximum number of points
+
+    Returns:
+        points itself if already short enough, else a downsampled list
+    """
+    n = len(points)
+    step = max(1, -(-n // max_points))
+    if step == 1:
+        return points
+    return points[:n - 1:step] + points[-1:]
 
 
 def get_frame_timing(episode_data: Dict[str, Any], frame_idx: int, playback_speed: float = 1.0) -> float:
@@ -130,20 +188,20 @@ def get_frame_timing(episode_data: Dict[str, Any], frame_idx: int, playback_spee
     Calculate wait time for a frame based on timestamp and playback speed.
 
     Args:
-        episode_data: Full episode data dictionary
+        episode_data: Episode data from load_episode
         frame_idx: Current frame index
         playback_speed: Playback speed multiplier (1.0 = real-time)
 
     Returns:
         Wait time in seconds
     """
-    frames = episode_data['frames']
+    t = episode_data['t']
 
-    if frame_idx >= len(frames) - 1:
+    if frame_idx >= len(t) - 1:
         return 0.1  # Default wait for last frame
 
-    current_t = frames[frame_idx]['t']
-    next_t = frames[frame_idx + 1]['t']
+    current_t = float(t[frame_idx])
+    next_t = float(t[frame_idx + 1])
 
     dt = next_t - current_t
 
@@ -161,7 +219,7 @@ def auto_configure_from_metadata(metadata: Dict[str, Any], config: Visualization
     Args:
         metadata: Episode metadata dictionary
         config: Existing config to update (creates new if None)
-        episode_data: Full episode data (optional, for auto-detecting Z inversion)
+        episode_data: Episode data from load_episode (optional, for auto-detecting Z inversion)
 
     Returns:
         Updated VisualizationConfig
@@ -173,19 +231,18 @@ def auto_configure_from_metadata(metadata: Dict[str, Any], config: Visualization
     coord_system = metadata.get('coordinate_system', 'NED').upper()
 
     # Auto-detect Z inversion if episode data provided
-    if episode_data and 'frames' in episode_data:
+    if episode_data and 'defender_pos' in episode_data:
         # Sample some Z values from the episode data
-        sample_z_values = []
-        for i in range(0, min(10, len(episode_data['frames'])), max(1, len(episode_data['frames']) // 10)):
-            frame = episode_data['frames'][i]
-            if 'defender' in frame and 'pos' in frame['defender']:
-                sample_z_values.append(frame['defender']['pos'][2])
-            if 'attacker' in frame and 'pos' in frame['attacker']:
-                sample_z_values.append(frame['attacker']['pos'][2])
+        n_frames = episode_data['n_frames']
+        sampled = slice(0, min(10, n_frames), max(1, n_frames // 10))
+        sample_z_values = np.concatenate((
+            episode_data['defender_pos'][sampled, 2],
+            episode_data['attacker_pos'][sampled, 2]
+        ))
 
         # If most Z values are positive, assume Z+ up system and invert
-        if sample_z_values:
-            avg_z = sum(sample_z_values) / len(sample_z_values)
+        if sample_z_values.size:
+            avg_z = float(sample_z_values.mean())
             if avg_z > 1.0:  # If average Z is significantly positive (>1m)
                 print(f"\n⚠️  Auto-detected Z+ up coordinate system (avg Z = {avg_z:.2f}m)")
                 print(f"   Setting INVERT_Z = True to convert to NED (negative Z = up)")
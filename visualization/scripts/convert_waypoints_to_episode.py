@@ -12,43 +12,271 @@ Example:
     python convert_waypoints_to_episode.py ../data/airsim_waypoints/episode_0010_airsim.json ../data/episodes/episode_0010.json
 """
 
-import json
 import sys
 import re
+import functools
 from pathlib import Path
 
+import numpy as np
 
+# Add scripts directory to path
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import _fast_json
+
+# ijson is optional: streams waypoints instead of loading the whole file
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Bump whenever the conversion output changes (units, format handling,
+# frame layout): episodes cached from a conversion with another version
+# are rebuilt (see visualize_episode.load_episode_cache)
+CONVERTER_VERSION = 1
+
+# Waypoints converted per vectorised batch when streaming
+WAYPOINT_CHUNK_SIZE = 4096
+
+# Constant parts of every frame, shared rather than rebuilt per frame.
+# Frames from waypoints_to_frames must therefore be treated as read-only.
+_ZERO_VEL = [0.0, 0.0, 0.0]
+_OLD_FORMAT_ATTACKER = {
+    'pos': [-5.0, 5.0, 3.0],
+    'vel': _ZERO_VEL,
+    'rpy': [0.0, 0.0, 0.0]
+}
+_OLD_FORMAT_BASE = {
+    'pos': [0.0, 0.0, 0.0]
+}
+
+# Compiled once instead of on every call
+_TIME_RE = re.compile(r't=([\d.]+)s')
+_EPISODE_RE = re.compile(r'episode_(\d+)')
+
+
+@functools.lru_cache(maxsize=4096)
 def extract_time_from_description(description: str) -> float:
     """Extract time value from waypoint description."""
-    match = re.search(r't=([\d.]+)s', description)
+    match = _TIME_RE.search(description)
     if match:
         return float(match.group(1))
     return 0.0
 
 
-def convert_waypoints_to_episode(input_file: str, output_file: str):
+def waypoints_to_frames(waypoints: list, units: str) -> list:
     """
-    Convert waypoint JSON to multi-agent episode format.
+    Convert a list of waypoints to episode frames.
+
+    Args:
+        waypoints: Waypoint dictionaries (new multi-agent or old single-agent format)
+        units: Source units of the positions ('centimeters' or meters)
+
+    Returns:
+        List of frame dictionaries with positions in meters (read-only,
+        constant parts are shared between frames)
+    """
+    # New format waypoints have defender/attacker/base, old format a single position
+    is_multi = [('defender' in wp and 'attacker' in wp) for wp in waypoints]
+    multi_wps = [wp for wp, multi in zip(waypoints, is_multi) if multi]
+
+    # All agents' positions in one (N_def + 2 * N_multi, 3) array, so the
+    # unit conversion is a single in-place op with no temporaries
+    pos_dicts = [wp['defender']['position'] if multi else wp['position']
+                 for wp, multi in zip(waypoints, is_multi)]
+    pos_dicts += [wp['attacker']['position'] for wp in multi_wps]
+    pos_dicts += [wp['base']['position'] for wp in multi_wps]
+
+    positions = np.array([[p['x'], p['y'], p['z']] for p in pos_dicts], dtype=np.float64).reshape(-1, 3)
+    if units == 'centimeters':
+        # Convert cm to meters
+        positions /= 100.0
+    positions = positions.tolist()
+
+    n_def = len(waypoints)
+    n_multi = len(multi_wps)
+    defender_positions = iter(positions[:n_def])
+    attacker_positions = iter(positions[n_def:n_def + n_multi])
+    base_positions = iter(positions[n_def + n_multi:])
+
+    frames = []
+    for waypoint, multi in zip(waypoints, is_multi):
+        defender_pos = next(defender_positions)
+
+        if multi:
+            # New multi-agent format (has 't' field)
+            frame = {
+                't': waypoint.get('t', 0.0),
+                'defender': {
+                    'pos': defender_pos,
+                    'vel': _ZERO_VEL,  # Unknown velocity
+                    'rpy': [0.0, 0.0, waypoint['defender'].get('yaw', 0.0)]
+                },
+                'attacker': {
+                    'pos': next(attacker_positions),
+                    'vel': _ZERO_VEL,  # Unknown velocity
+                    'rpy': [0.0, 0.0, waypoint['attacker'].get('yaw', 0.0)]
+                },
+                'base': {
+                    'pos': next(base_positions)
+                }
+            }
+        else:
+            # Old single-agent format (attacker at distant location)
+            frame = {
+                't': extract_time_from_description(waypoint.get('description', '')),
+                'defender': {
+                    'pos': defender_pos,
+                    'vel': _ZERO_VEL,
+                    'rpy': [0.0, 0.0, waypoint.get('yaw', 0.0)]
+                },
+                'attacker': _OLD_FORMAT_ATTACKER,
+                'base': _OLD_FORMAT_BASE
+            }
+
+        frames.append(frame)
+
+    return frames
+
+
+def _iter_chunks(items, size: int):
+    """Yield lists of up to size items from an iterator."""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _iter_waypoints(f, header: dict):
+    """
+    Yield the waypoints of a waypoint file from one ijson pass, storing its
+    top-level scalar fields in header as they are passed.
+
+    Raises:
+        ValueError: If 'units' comes after the first waypoint (the waypoints
+            before it would already have been converted with the wrong units)
+    """
+    builder = None
+    started = False
+    for prefix, event, value in ijson.parse(f, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == 'waypoints.item' and event == 'end_map':
+                yield builder.value
+                builder = None
+        elif prefix == 'waypoints.item' and event == 'start_map':
+            started = True
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+        elif prefix and '.' not in prefix and event in ('string', 'number', 'boolean', 'null'):
+            if prefix == 'units' and started:
+                raise ValueError("'units' must come before 'waypoints' in the input file")
+            header[prefix] = value
+
+
+def load_waypoints(input_file: str):
+    """
+    Load waypoint file metadata and waypoints.
+
+    With ijson installed the file is streamed from disk in a single pass:
+    the waypoints are yielded in chunks, so the full document is never held
+    in memory, and the top-level scalar fields are collected on the way.
+    The returned dict then fills in as the chunks are consumed (fields
+    before 'waypoints' are in it once the first chunk is out, the rest once
+    the chunks are exhausted). Otherwise the file is parsed in one go and
+    all waypoints form a single chunk.
 
     Args:
         input_file: Path to input waypoint JSON
+
+    Returns:
+        (metadata dict of top-level scalar fields, iterable of waypoint lists)
+    """
+    if ijson is None:
+        waypoint_data = _fast_json.load_file(input_file)
+        return waypoint_data, [waypoint_data.get('waypoints', [])]
+
+    waypoint_data = {}
+
+    def stream():
+        with open(input_file, 'rb') as f:
+            yield from _iter_chunks(_iter_waypoints(f, waypoint_data), WAYPOINT_CHUNK_SIZE)
+
+    return waypoint_data, stream()
+
+
+def _iter_frames(waypoint_data: dict, waypoint_chunks):
+    """Convert waypoint chunks to frames, reading the units as each chunk arrives (see load_waypoints)."""
+    for chunk in waypoint_chunks:
+        yield from waypoints_to_frames(chunk, waypoint_data.get('units', 'centimeters'))
+
+
+def _indent_json(data: bytes, level: int) -> bytes:
+    """Shift an indented JSON value right by level spaces (after its first line)."""
+    return data.replace(b'\n', b'\n' + b' ' * level)
+
+
+def write_episode_json(metadata: dict, frames, output_file: str):
+    """
+    Write an episode JSON one frame at a time.
+
+    The layout matches a dump with indent=2, but only one frame is
+    serialized at a time, so the output is never held in memory as a whole
+    and frames may be a generator. Written to <output>.part and renamed at
+    the end, so an interrupted write never leaves a truncated episode behind.
+
+    Args:
+        metadata: Episode metadata, or a function of the number of frames
+            that returns it (it is then called and written after the frames)
+        frames: Iterable of frame dicts
         output_file: Path to output episode JSON
+
+    Returns:
+        (number of frames written, last frame or None)
     """
-    print(f"Loading waypoints from: {input_file}")
+    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
 
-    with open(input_file, 'r') as f:
-        waypoint_data = json.load(f)
+    n_frames = 0
+    last_frame = None
 
-    waypoints = waypoint_data.get('waypoints', [])
+    def write_metadata(f, metadata):
+        f.write(b'  "metadata": ')
+        f.write(_indent_json(_fast_json.dumps(metadata, indent=True), 2))
 
-    if not waypoints:
-        raise ValueError("No waypoints found in input file")
+    def write(f):
+        nonlocal n_frames, last_frame
+        f.write(b'{\n')
+        if not callable(metadata):
+            write_metadata(f, metadata)
+            f.write(b',\n')
+        f.write(b'  "frames": [')
 
-    print(f"Found {len(waypoints)} waypoints")
+        for frame in frames:
+            f.write(b',\n    ' if n_frames else b'\n    ')
+            f.write(_indent_json(_fast_json.dumps(frame, indent=True), 4))
+            n_frames += 1
+            last_frame = frame
 
+        f.write(b'\n  ]')
+        if callable(metadata):
+            f.write(b',\n')
+            write_metadata(f, metadata(n_frames))
+        f.write(b'\n}')
+
+    _fast_json._replace_with(output_file, write)
+    return n_frames, last_frame
+
+
+def _episode_metadata(input_file: str, waypoint_data: dict, n_waypoints: int) -> dict:
+    """Build the episode metadata from the waypoint file name and top-level fields."""
     # Extract metadata from file name and content
     episode_num = 0
-    match = re.search(r'episode_(\d+)', input_file)
+    match = _EPISODE_RE.search(input_file)
     if match:
         episode_num = int(match.group(1))
 
@@ -69,110 +297,94 @@ def convert_waypoints_to_episode(input_file: str, output_file: str):
 
     print(f"Coordinate system: {coordinate_system}, Units: {units}")
 
-    # Convert waypoints to frames
-    frames = []
-    total_reward = 0.0
+    # Calculate simple reward (based on successful completion)
+    total_reward = float(n_waypoints) if outcome == 'capture' else 0.0
+
+    return {
+        'episode': episode_num,
+        'total_reward': total_reward,
+        'steps': n_waypoints,
+        'outcome': outcome,
+        'coordinate_system': coordinate_system,
+        'source_units': units,
+        'converted_units': 'meters'
+    }
 
-    for waypoint in waypoints:
-        # Get time directly from waypoint (new format has 't' field)
-        t = waypoint.get('t', 0.0)
 
-        # Helper function to convert position based on units
-        def convert_position(pos_dict):
-            """Convert position dict to list with unit conversion."""
-            if units == 'centimeters':
-                # Convert cm to meters
-                return [pos_dict['x'] / 100.0, pos_dict['y'] / 100.0, pos_dict['z'] / 100.0]
-            else:
-                return [pos_dict['x'], pos_dict['y'], pos_dict['z']]
+def _print_conversion_summary(metadata: dict, n_frames: int, last_frame: dict):
+    """Print the summary shown after a conversion."""
+    print(f"\n✓ Conversion complete!")
+    print(f"  Episode: {metadata['episode']}")
+    print(f"  Outcome: {metadata['outcome']}")
+    print(f"  Total Frames: {n_frames}")
+    print(f"  Duration: {last_frame['t']:.2f}s")
+    print(f"  Total Reward: {metadata['total_reward']:.2f}")
 
-        # Check if new format (has defender/attacker/base) or old format (has single position)
-        if 'defender' in waypoint and 'attacker' in waypoint:
-            # New multi-agent format
-            defender_pos = convert_position(waypoint['defender']['position'])
-            defender_yaw = waypoint['defender'].get('yaw', 0.0)
 
-            attacker_pos = convert_position(waypoint['attacker']['position'])
-            attacker_yaw = waypoint['attacker'].get('yaw', 0.0)
+def convert_waypoints_to_episode_dict(input_file: str) -> dict:
+    """
+    Convert waypoint JSON to an in-memory multi-agent episode.
 
-            base_pos = convert_position(waypoint['base']['position'])
+    Same result as convert_waypoints_to_episode followed by loading the
+    output, without writing or reparsing the episode JSON.
 
-            # Create frame with multi-agent data
-            frame = {
-                't': t,
-                'defender': {
-                    'pos': defender_pos,
-                    'vel': [0.0, 0.0, 0.0],  # Unknown velocity
-                    'rpy': [0.0, 0.0, defender_yaw]
-                },
-                'attacker': {
-                    'pos': attacker_pos,
-                    'vel': [0.0, 0.0, 0.0],  # Unknown velocity
-                    'rpy': [0.0, 0.0, attacker_yaw]
-                },
-                'base': {
-                    'pos': base_pos
-                }
-            }
-        else:
-            # Old single-agent format
-            t = extract_time_from_description(waypoint.get('description', ''))
-            pos = waypoint['position']
-            defender_pos = convert_position(pos)
-            yaw = waypoint.get('yaw', 0.0)
+    Args:
+        input_file: Path to input waypoint JSON
 
-            # Create frame with multi-agent data (attacker at distant location)
-            frame = {
-                't': t,
-                'defender': {
-                    'pos': defender_pos,
-                    'vel': [0.0, 0.0, 0.0],
-                    'rpy': [0.0, 0.0, yaw]
-                },
-                'attacker': {
-                    'pos': [-5.0, 5.0, 3.0],
-                    'vel': [0.0, 0.0, 0.0],
-                    'rpy': [0.0, 0.0, 0.0]
-                },
-                'base': {
-                    'pos': [0.0, 0.0, 0.0]
-                }
-            }
+    Returns:
+        Episode dictionary with 'metadata' and 'frames' (frames are
+        read-only, see waypoints_to_frames)
+    """
+    print(f"Loading waypoints from: {input_file}")
 
-        frames.append(frame)
+    waypoint_data, waypoint_chunks = load_waypoints(input_file)
+    frames = list(_iter_frames(waypoint_data, waypoint_chunks))
 
-        # Calculate simple reward (based on successful completion)
-        if outcome == 'capture':
-            total_reward += 1.0
-
-    # Create episode data structure
-    episode_data = {
-        'metadata': {
-            'episode': episode_num,
-            'total_reward': total_reward,
-            'steps': len(frames),
-            'outcome': outcome,
-            'coordinate_system': coordinate_system,
-            'source_units': units,
-            'converted_units': 'meters'
-        },
-        'frames': frames
-    }
+    if not frames:
+        raise ValueError("No waypoints found in input file")
 
-    # Save converted episode
-    output_path = Path(output_file)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    print(f"Found {len(frames)} waypoints")
+
+    metadata = _episode_metadata(input_file, waypoint_data, len(frames))
+
+    _print_conversion_summary(metadata, len(frames), frames[-1])
+
+    return {'metadata': metadata, 'frames': frames}
 
+
+def convert_waypoints_to_episode(input_file: str, output_file: str):
+    """
+    Convert waypoint JSON to multi-agent episode format.
+
+    Args:
+        input_file: Path to input waypoint JSON
+        output_file: Path to output episode JSON
+    """
+    print(f"Loading waypoints from: {input_file}")
+
+    waypoint_data, waypoint_chunks = load_waypoints(input_file)
+    metadata = None
+
+    def episode_metadata(n_waypoints):
+        # The metadata depends on the waypoint count, which is only known
+        # once the single pass over the input is done
+        nonlocal metadata
+        if n_waypoints == 0:
+            raise ValueError("No waypoints found in input file")
+
+        print(f"Found {n_waypoints} waypoints")
+        metadata = _episode_metadata(input_file, waypoint_data, n_waypoints)
+        return metadata
+
+    # Save converted episode
     print(f"\nWriting episode to: {output_file}")
-    with open(output_file, 'w') as f:
-        json.dump(episode_data, f, indent=2)
 
-    print(f"\n✓ Conversion complete!")
-    print(f"  Episode: {episode_num}")
-    print(f"  Outcome: {outcome}")
-    print(f"  Total Frames: {len(frames)}")
-    print(f"  Duration: {frames[-1]['t']:.2f}s")
-    print(f"  Total Reward: {total_reward:.2f}")
+    # Frames are converted chunk by chunk as they are written, so the whole
+    # episode is never built in memory; the metadata is written after them
+    frames = _iter_frames(waypoint_data, waypoint_chunks)
+    n_frames, last_frame = write_episode_json(episode_metadata, frames, output_file)
+
+    _print_conversion_summary(metadata, n_frames, last_frame)
 
 
 def main():
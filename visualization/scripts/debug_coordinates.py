@@ -1,16 +1,31 @@
 #!/usr/bin/env python3
 """Debug coordinate transformations"""
-import json
 import sys
 
+import numpy as np
+
+# Add scripts directory to path
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import _fast_json
+
+# ijson is optional: lets us parse only the first waypoint of a large file
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 if len(sys.argv) < 2:
     print("Usage: python debug_coordinates.py <waypoints_json>")
     sys.exit(1)
 
-with open(sys.argv[1], 'r') as f:
-    data = json.load(f)
-
-waypoint = data['waypoints'][0]
+if ijson is not None:
+    # Stop parsing as soon as the first waypoint is complete
+    with open(sys.argv[1], 'rb') as f:
+        waypoint = next(ijson.items(f, 'waypoints.item', use_float=True))
+else:
+    waypoint = _fast_json.load_file(sys.argv[1])['waypoints'][0]
 scale = 10.0
 
 print("\n" + "="*60)
@@ -27,10 +42,9 @@ print(f"  Defender: x={def_raw['x']}, y={def_raw['y']}, z={def_raw['z']}")
 print(f"  Attacker: x={att_raw['x']}, y={att_raw['y']}, z={att_raw['z']}")
 print(f"  Base: x={base_raw['x']}, y={base_raw['y']}, z={base_raw['z']}")
 
-# Convert to meters
-def_m = [def_raw['x']/100, def_raw['y']/100, def_raw['z']/100]
-att_m = [att_raw['x']/100, att_raw['y']/100, att_raw['z']/100]
-base_m = [base_raw['x']/100, base_raw['y']/100, base_raw['z']/100]
+# Convert to meters, one row per agent (defender, attacker, base)
+pos_m = np.array([[p['x'], p['y'], p['z']] for p in (def_raw, att_raw, base_raw)], dtype=np.float64) / 100
+def_m, att_m, base_m = pos_m
 
 print(f"\nCONVERTED TO METERS:")
 print(f"  Defender: x={def_m[0]:.3f}, y={def_m[1]:.3f}, z={def_m[2]:.3f}")
@@ -40,21 +54,23 @@ print(f"  Base: x={base_m[0]:.3f}, y={base_m[1]:.3f}, z={base_m[2]:.3f}")
 print(f"\nCURRENT TRANSFORMATION (X/Y swap, scale={scale}):")
 print(f"  data Y → AirSim X (flipped), data X → AirSim Y")
 
-def_airsim = [-def_m[1]*scale, def_m[0]*scale, def_m[2]]
-att_airsim = [-att_m[1]*scale, att_m[0]*scale, att_m[2]]
+# Candidate transforms as 3x3 matrices, applied to all agents at once
+swap_mat = np.array([[0, -scale, 0], [scale, 0, 0], [0, 0, 1]])
+scale_mat = np.diag([scale, scale, 1])
+flip_mat = np.diag([scale, -scale, 1])
+
+def_airsim, att_airsim, _ = pos_m @ swap_mat.T
 
 print(f"  Defender: X={def_airsim[0]:.2f}, Y={def_airsim[1]:.2f}, Z={def_airsim[2]:.2f}")
 print(f"  Attacker: X={att_airsim[0]:.2f}, Y={att_airsim[1]:.2f}, Z={att_airsim[2]:.2f}")
 
 print(f"\nALTERNATIVE: No swap, just scale (X→X, Y→Y):")
-def_alt = [def_m[0]*scale, def_m[1]*scale, def_m[2]]
-att_alt = [att_m[0]*scale, att_m[1]*scale, att_m[2]]
+def_alt, att_alt, _ = pos_m @ scale_mat.T
 print(f"  Defender: X={def_alt[0]:.2f}, Y={def_alt[1]:.2f}, Z={def_alt[2]:.2f}")
 print(f"  Attacker: X={att_alt[0]:.2f}, Y={att_alt[1]:.2f}, Z={att_alt[2]:.2f}")
 
 print(f"\nALTERNATIVE: Flip Y only (X→X, -Y→Y):")
-def_alt2 = [def_m[0]*scale, -def_m[1]*scale, def_m[2]]
-att_alt2 = [att_m[0]*scale, -att_m[1]*scale, att_m[2]]
+def_alt2, att_alt2, _ = pos_m @ flip_mat.T
 print(f"  Defender: X={def_alt2[0]:.2f}, Y={def_alt2[1]:.2f}, Z={def_alt2[2]:.2f}")
 print(f"  Attacker: X={att_alt2[0]:.2f}, Y={att_alt2[1]:.2f}, Z={att_alt2[2]:.2f}")
 
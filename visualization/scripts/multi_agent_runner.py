@@ -12,7 +12,118 @@ import airsim
 import numpy as np
 import time
 from typing import Dict, List, Tuple, Any, Optional
-from config import VisualizationConfig, transform_position, transform_orientation, calculate_velocity_magnitude
+from config import VisualizationConfig, transform_positions_batch
+from _pathkernels import to_wire_points
+
+
+# Constant arguments of the per-frame label calls, built once rather than
+# as fresh lists on every frame
+_DEFENDER_LABEL = ["DEFENDER"]
+_ATTACKER_LABEL = ["ATTACKER"]
+_DEFENDER_LABEL_COLOR = [0.0, 1.0, 0.0, 1.0]
+_ATTACKER_LABEL_COLOR = [1.0, 0.0, 0.0, 1.0]
+
+
+def wait_until_settled(client: airsim.MultirotorClient, vehicle_names: List[str],
+                       speed_threshold: float = 0.05, timeout: float = 2.0,
+                       poll_interval: float = 0.05) -> bool:
+    """
+    Wait until all vehicles are (nearly) at rest, instead of a fixed sleep.
+
+    Args:
+        client: Connected AirSim client
+        vehicle_names: Vehicles to check
+        speed_threshold: Speed (m/s) below which a vehicle counts as settled
+        timeout: Maximum time to wait in seconds (the old fixed sleep)
+        poll_interval: Time between state checks in seconds
+
+    Returns:
+        True if all vehicles settled, False if the timeout was reached
+    """
+    deadline = time.time() + timeout
+    # Compare squared speeds, so no square root per check
+    threshold_sq = speed_threshold * speed_threshold
+    while True:
+        # Ground-truth kinematics only (a much smaller reply than the full
+        # multirotor state), requested for every vehicle at once
+        settled = True
+        for kinematics in call_for_vehicles(client, 'simGetGroundTruthKinematics', vehicle_names):
+            vel = airsim.KinematicsState.from_msgpack(kinematics).linear_velocity
+            if vel.x_val * vel.x_val + vel.y_val * vel.y_val + vel.z_val * vel.z_val >= threshold_sq:
+                settled = False
+                break
+
+        if settled:
+            return True
+        if time.time() >= deadline:
+            return False
+        time.sleep(poll_interval)
+
+
+def wait_until_landed(client: airsim.MultirotorClient, vehicle_names: List[str],
+                      timeout: float = 3.0, poll_interval: float = 0.05) -> bool:
+    """
+    Wait until all vehicles report they are landed, instead of a fixed sleep.
+
+    Args:
+        client: Connected AirSim client
+        vehicle_names: Vehicles to check
+        timeout: Maximum time to wait in seconds (the old fixed sleep)
+        poll_interval: Time between state checks in seconds
+
+    Returns:
+        True if all vehicles landed, False if the timeout was reached
+    """
+    deadline = time.time() + timeout
+    while True:
+        states = call_for_vehicles(client, 'getMultirotorState', vehicle_names)
+        if all(airsim.MultirotorState.from_msgpack(state).landed_state == airsim.LandedState.Landed
+               for state in states):
+            return True
+        if time.time() >= deadline:
+            return False
+        time.sleep(poll_interval)
+
+
+def call_for_vehicles(client: airsim.MultirotorClient, method: str,
+                      vehicle_names: List[str], *args) -> list:
+    """
+    Call one RPC for several vehicles, sending every request before waiting.
+
+    For the sync-only setup calls whose vehicle name comes last, e.g.
+    call_for_vehicles(client, 'armDisarm', names, True) is armDisarm(True, name)
+    for each name, with the round-trips overlapped.
+
+    Args:
+        client: Connected AirSim client
+        method: RPC method name
+        vehicle_names: Vehicles to call it for
+        *args: Arguments before the vehicle name
+
+    Returns:
+        The results, in vehicle_names order
+    """
+    rpc = client.client
+    futures = [rpc.call_async(method, *args, name) for name in vehicle_names]
+    return [f.get() for f in futures]
+
+
+def _segment_pairs(points: np.ndarray) -> np.ndarray:
+    """
+    Turn an (N, 3) polyline into the (2*(N-1), 3) start/end pairs of its
+    segments, the point layout simPlotLineList expects.
+    """
+    pairs = np.empty((2 * (len(points) - 1), 3))
+    pairs[0::2] = points[:-1]
+    pairs[1::2] = points[1:]
+    return pairs
+
+
+def _set_point(point: airsim.Vector3r, x: float, y: float, z: float):
+    """Overwrite a Vector3r's coordinates in place."""
+    point.x_val = x
+    point.y_val = y
+    point.z_val = z
 
 
 class MultiAgentRunner:
@@ -32,15 +143,54 @@ class MultiAgentRunner:
         self.defender_name = self.config.DEFENDER_NAME
         self.attacker_name = self.config.ATTACKER_NAME
 
-        # Trajectory storage for visualization
-        self.defender_trajectory = []
-        self.attacker_trajectory = []
+        # Transform parameters, read once instead of on every frame
+        self._cache_transform()
+
+        # Trajectory storage for visualization, (capacity, 3) arrays filled
+        # up to _traj_len (see init_trajectory_buffers)
+        self._def_traj = np.empty((0, 3))
+        self._att_traj = np.empty((0, 3))
+        self._traj_len = 0
+        self._traj_drawn = 0  # Points already sent as trail segments
         self.base_position = None
 
+        # Pre-transformed episode positions, (N, 3) arrays for the frames
+        # from _xyz_start on (see preprocess_episode)
+        self._def_xyz = None
+        self._att_xyz = None
+        self._base_xyz = None
+        self._xyz_start = 0
+
+        # One-element point lists for the vehicle markers and labels, updated
+        # in place each frame (requests are packed when sent, so reuse is safe)
+        self._def_marker = [airsim.Vector3r()]
+        self._att_marker = [airsim.Vector3r()]
+        self._def_label_pos = [airsim.Vector3r()]
+        self._att_label_pos = [airsim.Vector3r()]
+
+        # Set to False the first time simPlotStrings fails, so unsupported
+        # AirSim versions don't pay for a failing RPC every frame
+        self._labels_supported = True
+
         # Statistics
         self.frame_count = 0
         self.start_time = None
 
+    def _cache_transform(self):
+        """
+        Snapshot the coordinate transform parameters from the config.
+
+        Call again if SCALE_FACTOR, INVERT_Z or Z_OFFSET change after init.
+        """
+        self._scale = self.config.SCALE_FACTOR
+        self._z_sign = -1.0 if self.config.INVERT_Z else 1.0
+        self._z_offset = self.config.Z_OFFSET
+
+    def _transform3(self, pos) -> Tuple[float, float, float]:
+        """Same result as transform_position, using the cached parameters."""
+        scale = self._scale
+        return (pos[0] * scale, pos[1] * scale, self._z_sign * (pos[2] * scale) + self._z_offset)
+
     def connect(self):
         """Connect to AirSim simulator."""
         print("Connecting to AirSim...")
@@ -55,9 +205,9 @@ class MultiAgentRunner:
         """Verify that both vehicles are configured in AirSim."""
         print(f"\nVerifying vehicles...")
         try:
-            # Try to get state of both vehicles
-            defender_state = self.client.getMultirotorState(vehicle_name=self.defender_name)
-            attacker_state = self.client.getMultirotorState(vehicle_name=self.attacker_name)
+            # Try to get the kinematics of both vehicles
+            call_for_vehicles(self.client, 'simGetGroundTruthKinematics',
+                              [self.defender_name, self.attacker_name])
             print(f"✓ Found vehicle: {self.defender_name}")
             print(f"✓ Found vehicle: {self.attacker_name}")
         except Exception as e:
@@ -72,13 +222,11 @@ class MultiAgentRunner:
         """Initialize both drones for flight."""
         print("\nSetting up vehicles...")
 
-        # Enable API control
-        self.client.enableApiControl(True, self.defender_name)
-        self.client.enableApiControl(True, self.attacker_name)
+        names = [self.defender_name, self.attacker_name]
 
-        # Arm drones
-        self.client.armDisarm(True, self.defender_name)
-        self.client.armDisarm(True, self.attacker_name)
+        # Enable API control, then arm drones (both vehicles at once each step)
+        call_for_vehicles(self.client, 'enableApiControl', names, True)
+        call_for_vehicles(self.client, 'armDisarm', names, True)
 
         print(f"✓ {self.defender_name} armed and ready")
         print(f"✓ {self.attacker_name} armed and ready")
@@ -94,30 +242,110 @@ class MultiAgentRunner:
         f1.join()
         f2.join()
 
-        time.sleep(2)  # Let drones stabilize
+        # Let drones stabilize (returns early once both are hovering)
+        wait_until_settled(self.client, [self.defender_name, self.attacker_name], timeout=2.0)
         print("✓ Both vehicles airborne")
 
-    def move_to_frame(self, frame_data: Dict[str, Any], wait: bool = True):
+    def preprocess_episode(self, episode_data: Dict[str, Any], start_frame: int = 0,
+                           end_frame: Optional[int] = None):
+        """
+        Transform the positions of the frames to be played up front, in one
+        vectorised pass over all agents, so playback only has RPC calls left
+        to do.
+
+        Args:
+            episode_data: Episode data from load_episode
+            start_frame: First frame that will be played
+            end_frame: Frame to stop before (None = end of episode)
+        """
+        start, stop, _ = slice(start_frame, end_frame).indices(episode_data['n_frames'])
+        agents = [episode_data['defender_pos'], episode_data['attacker_pos']]
+        if episode_data['base_pos'] is not None:
+            agents.append(episode_data['base_pos'])
+
+        # One (N, agents, 3) block, transformed in one pass
+        xyz = transform_positions_batch(np.stack([pos[start:stop] for pos in agents], axis=1), self.config)
+        self._def_xyz = xyz[:, 0]
+        self._att_xyz = xyz[:, 1]
+        self._base_xyz = xyz[:, 2] if len(agents) == 3 else None
+        self._xyz_start = start
+        self.init_trajectory_buffers(stop - start)
+
+    def init_trajectory_buffers(self, n_frames: int):
+        """
+        Preallocate trajectory storage for n_frames frames.
+
+        Args:
+            n_frames: Number of frames that will be played back
+        """
+        self._def_traj = np.empty((n_frames, 3))
+        self._att_traj = np.empty((n_frames, 3))
+        self._traj_len = 0
+        self._traj_drawn = 0
+
+    def _append_trajectory(self, def_x, def_y, def_z, att_x, att_y, att_z):
+        """Store one trajectory point per drone, doubling the buffers if full."""
+        n = self._traj_len
+        if n == len(self._def_traj):
+            capacity = max(64, 2 * n)
+            for name in ('_def_traj', '_att_traj'):
+                grown = np.empty((capacity, 3))
+                grown[:n] = getattr(self, name)[:n]
+                setattr(self, name, grown)
+
+        self._def_traj[n] = (def_x, def_y, def_z)
+        self._att_traj[n] = (att_x, att_y, att_z)
+        self._traj_len = n + 1
+
+    def play_episode(self, episode_data: Dict[str, Any], start_frame: int = 0,
+                     end_frame: Optional[int] = None, wait: bool = True):
+        """
+        Play frames [start_frame, end_frame) of an episode.
+
+        All positions are transformed up front by preprocess_episode, so the
+        loop only indexes the arrays and sends the moves.
+
+        Args:
+            episode_data: Episode data from load_episode
+            start_frame: First frame to play
+            end_frame: Frame to stop before (None = end of episode)
+            wait: If True, wait for each frame's movements to complete
+        """
+        self.preprocess_episode(episode_data, start_frame, end_frame)
+        start = self._xyz_start
+        self.start_time = time.time()
+
+        for frame_idx in range(start, start + len(self._def_xyz)):
+            self.move_to_frame(frame_idx=frame_idx, wait=wait)
+
+    def move_to_frame(self, frame_data: Optional[Dict[str, Any]] = None, wait: bool = True,
+                      frame_idx: Optional[int] = None):
         """
         Move both drones to positions specified in frame data.
 
         Args:
             frame_data: Frame dictionary with 'defender', 'attacker', 'base' positions
             wait: If True, wait for movements to complete
+            frame_idx: Episode frame index to read from the arrays built by
+                preprocess_episode, instead of transforming frame_data
         """
-        # Extract positions
-        defender_pos_raw = frame_data['defender']['pos']
-        attacker_pos_raw = frame_data['attacker']['pos']
-        base_pos_raw = frame_data['base']['pos']
-
-        # Transform coordinates
-        def_x, def_y, def_z = transform_position(defender_pos_raw, self.config)
-        att_x, att_y, att_z = transform_position(attacker_pos_raw, self.config)
-        base_x, base_y, base_z = transform_position(base_pos_raw, self.config)
+        if frame_idx is not None:
+            # Positions were transformed in preprocess_episode
+            i = frame_idx - self._xyz_start
+            if self._def_xyz is None or not 0 <= i < len(self._def_xyz):
+                raise IndexError(f"Frame {frame_idx} was not preprocessed (call preprocess_episode first)")
+            def_x, def_y, def_z = self._def_xyz[i].tolist()
+            att_x, att_y, att_z = self._att_xyz[i].tolist()
+            base = None if self._base_xyz is None else self._base_xyz[i].tolist()
+        else:
+            # Transform coordinates
+            def_x, def_y, def_z = self._transform3(frame_data['defender']['pos'])
+            att_x, att_y, att_z = self._transform3(frame_data['attacker']['pos'])
+            base = self._transform3(frame_data['base']['pos'])
 
         # Store base position for visualization (first time only)
-        if self.base_position is None:
-            self.base_position = [base_x, base_y, base_z]
+        if self.base_position is None and base is not None:
+            self.base_position = list(base)
             self._visualize_base()
 
         # Debug: Print positions being sent
@@ -126,35 +354,50 @@ class MultiAgentRunner:
             print(f"    → Attacker target: ({att_x:.2f}, {att_y:.2f}, {att_z:.2f})")
 
         # Move drones using moveToPositionAsync with reasonable velocity
+        # Both *Async calls return as soon as the request is sent, so the two
+        # moves already run concurrently in the simulator. The RPC client is
+        # not thread-safe, so no thread pool is used to dispatch them.
         velocity = 5.0  # m/s - moderate velocity for smooth following
-        f_def = self.client.moveToPositionAsync(
+        move = self.client.moveToPositionAsync
+        f_def = move(
             def_x, def_y, def_z,
             velocity,
             timeout_sec=30,  # Longer timeout to prevent premature cancellation
             vehicle_name=self.defender_name
         )
-        f_att = self.client.moveToPositionAsync(
+        f_att = move(
             att_x, att_y, att_z,
             velocity,
             timeout_sec=30,
             vehicle_name=self.attacker_name
         )
 
-        # Wait for movement to complete if requested
+        # Wait for movement to complete if requested (both moves are sent
+        # before either join so they still overlap)
         if wait:
             f_def.join()
             f_att.join()
 
+        # Drop the futures now rather than keeping their responses alive
+        # through the plotting calls below
+        del f_def, f_att
+
         # Store trajectory points
-        self.defender_trajectory.append([def_x, def_y, def_z])
-        self.attacker_trajectory.append([att_x, att_y, att_z])
+        self._append_trajectory(def_x, def_y, def_z, att_x, att_y, att_z)
+
+        # Send this frame's plot requests back to back and wait on them once,
+        # instead of paying a full round-trip per draw call
+        pending = []
 
         # Draw trajectories periodically
-        if self.config.SHOW_TRAJECTORIES and len(self.defender_trajectory) % 10 == 0:
-            self._draw_trajectories()
+        if self.config.SHOW_TRAJECTORIES and self._traj_len % 10 == 0:
+            pending += self._draw_trajectories()
 
         # Draw identification markers at TARGET positions (where drones should be going)
-        self._draw_vehicle_markers(def_x, def_y, def_z, att_x, att_y, att_z)
+        pending += self._draw_vehicle_markers(def_x, def_y, def_z, att_x, att_y, att_z)
+
+        for f in pending:
+            f.get()
 
         self.frame_count += 1
 
@@ -165,55 +408,60 @@ class MultiAgentRunner:
         Args:
             def_x, def_y, def_z: Defender position
             att_x, att_y, att_z: Attacker position
+
+        Returns:
+            Futures for the marker plot requests (already sent, not yet awaited)
         """
         if not self.config.SHOW_VEHICLE_MARKERS:
-            return
+            return []
 
         # Height offset above drone
         marker_offset = self.config.VEHICLE_MARKER_OFFSET
+        rpc = self.client.client
+        pending = []
+
+        # Floating spheres above each drone (defender green, attacker red).
+        # simPlotPoints takes one color per call, so the two can't be merged;
+        # both are sent before either reply is awaited. Duration is short
+        # since the markers are redrawn every frame.
+        if self.frame_count % self.config.VEHICLE_MARKER_EVERY_N_FRAMES == 0:
+            size = self.config.VEHICLE_MARKER_SIZE
+            _set_point(self._def_marker[0], def_x, def_y, def_z + marker_offset)
+            _set_point(self._att_marker[0], att_x, att_y, att_z + marker_offset)
+            pending.append(rpc.call_async('simPlotPoints', self._def_marker,
+                                          self.config.TRAJECTORY_COLOR_DEFENDER, size, 0.5, False))
+            pending.append(rpc.call_async('simPlotPoints', self._att_marker,
+                                          self.config.TRAJECTORY_COLOR_ATTACKER, size, 0.5, False))
 
-        # Defender marker (Green) - floating sphere above drone
-        defender_marker_pos = airsim.Vector3r(def_x, def_y, def_z + marker_offset)
-        self.client.simPlotPoints(
-            points=[defender_marker_pos],
-            color_rgba=self.config.TRAJECTORY_COLOR_DEFENDER,
-            size=self.config.VEHICLE_MARKER_SIZE,
-            duration=0.5,  # Short duration, updated every frame
-            is_persistent=False
+        # Draw text labels (if supported in AirSim version)
+        # One call per label: simPlotStrings takes a single color per call.
+        # Text is the most expensive thing to render, so labels are drawn
+        # less often, each staying up until the next one is drawn.
+        label_every = self.config.VEHICLE_LABEL_EVERY_N_FRAMES
+        if not self._labels_supported or self.frame_count % label_every != 0:
+            return pending
+
+        label_duration = 0.5 * label_every
+        _set_point(self._def_label_pos[0], def_x, def_y, def_z + marker_offset - 0.3)
+        _set_point(self._att_label_pos[0], att_x, att_y, att_z + marker_offset - 0.3)
+        f_def_label = rpc.call_async(
+            'simPlotStrings', _DEFENDER_LABEL, self._def_label_pos,
+            2.0, _DEFENDER_LABEL_COLOR, label_duration
         )
-
-        # Attacker marker (Red) - floating sphere above drone
-        attacker_marker_pos = airsim.Vector3r(att_x, att_y, att_z + marker_offset)
-        self.client.simPlotPoints(
-            points=[attacker_marker_pos],
-            color_rgba=self.config.TRAJECTORY_COLOR_ATTACKER,
-            size=self.config.VEHICLE_MARKER_SIZE,
-            duration=0.5,
-            is_persistent=False
+        f_att_label = rpc.call_async(
+            'simPlotStrings', _ATTACKER_LABEL, self._att_label_pos,
+            2.0, _ATTACKER_LABEL_COLOR, label_duration
         )
 
-        # Draw text labels (if supported in AirSim version)
+        # Labels are awaited here so an unsupported-call error only turns
+        # labels off; the sphere requests are left for the caller to await
         try:
-            # Defender label
-            self.client.simPlotStrings(
-                strings=["DEFENDER"],
-                positions=[airsim.Vector3r(def_x, def_y, def_z + marker_offset - 0.3)],
-                scale=2.0,
-                color_rgba=[0.0, 1.0, 0.0, 1.0],
-                duration=0.5
-            )
-
-            # Attacker label
-            self.client.simPlotStrings(
-                strings=["ATTACKER"],
-                positions=[airsim.Vector3r(att_x, att_y, att_z + marker_offset - 0.3)],
-                scale=2.0,
-                color_rgba=[1.0, 0.0, 0.0, 1.0],
-                duration=0.5
-            )
-        except:
+            f_def_label.get()
+            f_att_label.get()
+        except Exception:
             # Text labels not supported in this AirSim version
-            pass
+            self._labels_supported = False
+        return pending
 
     def _visualize_base(self):
         """
@@ -256,59 +504,69 @@ class MultiAgentRunner:
                 duration=99999.0
             )
             print(f"'BASE' label at Z=-0.6m")
-        except:
+        except Exception:
             pass
 
         print(f"{'='*60}\n")
 
     def _draw_trajectories(self):
-        """Draw trajectory trails for both drones."""
-        if not self.config.SHOW_TRAJECTORIES:
-            return
+        """
+        Extend the trajectory trails of both drones.
 
-        # Draw defender trajectory (green)
-        if len(self.defender_trajectory) > 1:
-            points_def = [airsim.Vector3r(p[0], p[1], p[2]) for p in self.defender_trajectory]
-            self.client.simPlotLineStrip(
-                points=points_def,
-                color_rgba=self.config.TRAJECTORY_COLOR_DEFENDER,
-                thickness=self.config.TRAJECTORY_THICKNESS,
-                duration=5.0,  # Persist for 5 seconds
-                is_persistent=False
-            )
+        Each call sends only the segments added since the previous one
+        (starting from the last drawn point so the pieces join up), as one
+        simPlotLineList per drone. The history is never resent, and the
+        points are converted to their RPC form only here. How long segments
+        stay up is set by TRAJECTORY_TRAIL_DURATION/_PERSISTENT.
 
-        # Draw attacker trajectory (red)
-        if len(self.attacker_trajectory) > 1:
-            points_att = [airsim.Vector3r(p[0], p[1], p[2]) for p in self.attacker_trajectory]
-            self.client.simPlotLineStrip(
-                points=points_att,
-                color_rgba=self.config.TRAJECTORY_COLOR_ATTACKER,
-                thickness=self.config.TRAJECTORY_THICKNESS,
-                duration=5.0,
-                is_persistent=False
-            )
+        Returns:
+            Futures for the line list requests (already sent, not yet awaited)
+        """
+        n_points = self._traj_len
+        start = max(self._traj_drawn - 1, 0)
+        if not self.config.SHOW_TRAJECTORIES or n_points - start < 2:
+            return []
+
+        points_def = to_wire_points(_segment_pairs(self._def_traj[start:n_points]))
+        points_att = to_wire_points(_segment_pairs(self._att_traj[start:n_points]))
+        self._traj_drawn = n_points
+
+        # Defender trajectory (green) and attacker trajectory (red).
+        # One color per call, so two requests.
+        rpc = self.client.client
+        thickness = self.config.TRAJECTORY_THICKNESS
+        duration = self.config.TRAJECTORY_TRAIL_DURATION
+        persistent = self.config.TRAJECTORY_TRAIL_PERSISTENT
+        return [
+            rpc.call_async('simPlotLineList', points_def,
+                           self.config.TRAJECTORY_COLOR_DEFENDER, thickness, duration, persistent),
+            rpc.call_async('simPlotLineList', points_att,
+                           self.config.TRAJECTORY_COLOR_ATTACKER, thickness, duration, persistent),
+        ]
 
     def get_current_positions(self) -> Dict[str, Tuple[float, float, float]]:
         """
         Get current positions of both vehicles.
 
+        Positions are the ground-truth kinematics (world NED). For the
+        SimpleFlight vehicles used here this is what getMultirotorState
+        reports as kinematics_estimated; a vehicle with a real state
+        estimator may differ from its own estimate.
+
         Returns:
             Dictionary with 'defender' and 'attacker' positions
         """
-        def_state = self.client.getMultirotorState(vehicle_name=self.defender_name)
-        att_state = self.client.getMultirotorState(vehicle_name=self.attacker_name)
+        # Send both kinematics requests before waiting on either, so the two
+        # round-trips overlap on the one RPC connection. Kinematics alone is
+        # a much smaller reply than the full multirotor state.
+        def_kin, att_kin = call_for_vehicles(
+            self.client, 'simGetGroundTruthKinematics', [self.defender_name, self.attacker_name])
+        def_pos = airsim.KinematicsState.from_msgpack(def_kin).position
+        att_pos = airsim.KinematicsState.from_msgpack(att_kin).position
 
         return {
-            'defender': (
-                def_state.kinematics_estimated.position.x_val,
-                def_state.kinematics_estimated.position.y_val,
-                def_state.kinematics_estimated.position.z_val
-            ),
-            'attacker': (
-                att_state.kinematics_estimated.position.x_val,
-                att_state.kinematics_estimated.position.y_val,
-                att_state.kinematics_estimated.position.z_val
-            )
+            'defender': (def_pos.x_val, def_pos.y_val, def_pos.z_val),
+            'attacker': (att_pos.x_val, att_pos.y_val, att_pos.z_val)
         }
 
     def land_and_disarm(self):
@@ -322,13 +580,11 @@ class MultiAgentRunner:
         f1.join()
         f2.join()
 
-        # Disarm
-        self.client.armDisarm(False, self.defender_name)
-        self.client.armDisarm(False, self.attacker_name)
+        names = [self.defender_name, self.attacker_name]
 
-        # Disable API control
-        self.client.enableApiControl(False, self.defender_name)
-        self.client.enableApiControl(False, self.attacker_name)
+        # Disarm, then disable API control
+        call_for_vehicles(self.client, 'armDisarm', names, False)
+        call_for_vehicles(self.client, 'enableApiControl', names, False)
 
         print("✓ Both vehicles landed and disarmed")
 
@@ -336,9 +592,21 @@ class MultiAgentRunner:
         """Reset simulation."""
         print("\nResetting simulation...")
         self.client.reset()
-        self.defender_trajectory = []
-        self.attacker_trajectory = []
+
+        # The base marker (and trails, if TRAJECTORY_TRAIL_PERSISTENT) are
+        # persistent, so clear them too
+        try:
+            self.client.simFlushPersistentMarkers()
+        except Exception:
+            pass
+
+        self._traj_drawn = 0
+        self._traj_len = 0
         self.base_position = None
+        self._def_xyz = None
+        self._att_xyz = None
+        self._base_xyz = None
+        self._xyz_start = 0
         self.frame_count = 0
         print("✓ Simulation reset")
 
@@ -348,7 +616,10 @@ class MultiAgentRunner:
             return
 
         elapsed_time = time.time() - self.start_time
-        total_frames = len(episode_data['frames'])
+        if 'frames' in episode_data:
+            total_frames = len(episode_data['frames'])
+        else:
+            total_frames = episode_data['n_frames']
 
         print("\n" + "="*60)
         print("EPISODE STATISTICS")
@@ -7,18 +7,22 @@ Usage:
     python set_sim_speed.py 1.0    # Reset to normal speed
 """
 
-import json
 import sys
 from pathlib import Path
 
+# Add scripts directory to path
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import _fast_json
+
 def set_clock_speed(settings_path: str, clock_speed: float):
     """Update ClockSpeed in AirSim settings.json"""
 
     settings_file = Path(settings_path)
 
     if settings_file.exists():
-        with open(settings_file, 'r') as f:
-            settings = json.load(f)
+        settings = _fast_json.load_file(settings_file)
     else:
         print(f"⚠️  Settings file not found: {settings_path}")
         print("Creating new settings file...")
@@ -33,8 +37,7 @@ def set_clock_speed(settings_path: str, clock_speed: float):
 
     # Write back
     settings_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(settings_file, 'w') as f:
-        json.dump(settings, f, indent=2)
+    _fast_json.dump_file(settings, settings_file, indent=True)
 
     print(f"✓ Updated ClockSpeed to {clock_speed}x in {settings_path}")
     print(f"\n⚠️  IMPORTANT: Restart Unreal Engine for changes to take effect!")
@@ -5,6 +5,13 @@ Simple test to verify basic AirSim movement works.
 
 import airsim
 import time
+import sys
+
+# Add scripts directory to path
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from multi_agent_runner import wait_until_settled, call_for_vehicles
 
 # Connect
 print("Connecting to AirSim...")
@@ -14,13 +21,11 @@ print("✓ Connected")
 
 # Enable API control
 print("\nEnabling API control...")
-client.enableApiControl(True, "Defender")
-client.enableApiControl(True, "Attacker")
+call_for_vehicles(client, 'enableApiControl', ["Defender", "Attacker"], True)
 
 # Arm
 print("Arming...")
-client.armDisarm(True, "Defender")
-client.armDisarm(True, "Attacker")
+call_for_vehicles(client, 'armDisarm', ["Defender", "Attacker"], True)
 
 # Takeoff
 print("Taking off...")
@@ -29,14 +34,12 @@ f2 = client.takeoffAsync(vehicle_name="Attacker")
 f1.join()
 f2.join()
 
-print("Waiting 3 seconds after takeoff...")
-time.sleep(3)
+print("Waiting for drones to stabilize (max 3 seconds)...")
+wait_until_settled(client, ["Defender", "Attacker"], timeout=3.0)
 
 # Check positions
-def_state = client.getMultirotorState(vehicle_name="Defender")
-att_state = client.getMultirotorState(vehicle_name="Attacker")
-def_pos = def_state.kinematics_estimated.position
-att_pos = att_state.kinematics_estimated.position
+def_pos = client.simGetGroundTruthKinematics(vehicle_name="Defender").position
+att_pos = client.simGetGroundTruthKinematics(vehicle_name="Attacker").position
 
 print(f"\nAfter takeoff:")
 print(f"  Defender: ({def_pos.x_val:.2f}, {def_pos.y_val:.2f}, {def_pos.z_val:.2f})")
@@ -56,11 +59,10 @@ print("Waiting for movement to complete...")
 f.join()
 
 print("Movement command completed")
-time.sleep(1)
+wait_until_settled(client, ["Defender"], timeout=1.0)
 
 # Check new position
-def_state = client.getMultirotorState(vehicle_name="Defender")
-def_pos = def_state.kinematics_estimated.position
+def_pos = client.simGetGroundTruthKinematics(vehicle_name="Defender").position
 print(f"Final:   ({def_pos.x_val:.2f}, {def_pos.y_val:.2f}, {def_pos.z_val:.2f})")
 
 # Land
@@ -18,61 +18,463 @@ Date: 2025
 """
 
 import airsim
-import json
+import copy
+import operator
 import time
+import threading
 import sys
+import zipfile
 import argparse
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
 
 # Add scripts directory to path
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from config import VisualizationConfig, print_config_summary, get_frame_timing, transform_position, auto_configure_from_metadata
-from multi_agent_runner import MultiAgentRunner
+import _fast_json
+from config import VisualizationConfig, print_config_summary, auto_configure_from_metadata, downsample_points
+from multi_agent_runner import MultiAgentRunner, call_for_vehicles, wait_until_settled
+from _pathkernels import build_paths_multi, to_path_points, PathPoint
+
+# ijson is optional: streams frames instead of loading the whole episode
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Shared AirSim client (see get_client)
+_client = None
+
+# Colors for visualization
+COLOR_DEFENDER = [0.0, 1.0, 0.0, 1.0]  # Green
+COLOR_ATTACKER = [1.0, 0.0, 0.0, 1.0]  # Red
+COLOR_BASE = [0.0, 0.5, 1.0, 1.0]      # Cyan
+
+# Path-following settings shared by every moveOnPathAsync call
+PATH_DRIVETRAIN = airsim.DrivetrainType.MaxDegreeOfFreedom
+PATH_YAW_MODE = airsim.YawMode(is_rate=False, yaw_or_rate=0)
+
+
+def get_client() -> airsim.MultirotorClient:
+    """
+    Return the shared AirSim client, connecting on first use.
+
+    Reusing one connection avoids the RPC setup and handshake when several
+    episodes are visualized in one session.
+    """
+    global _client
+    if _client is None:
+        _client = airsim.MultirotorClient()
+        _client.confirmConnection()
+    return _client
+
+
+def release_client():
+    """Close the shared AirSim client (the next get_client reconnects)."""
+    global _client
+    if _client is not None:
+        _client.client.close()
+        _client = None
+
+
+# Layout of one packed frame (load_episode). Every field is float64, so a
+# buffer of these can also be viewed as an (N, 16) float array.
+EPISODE_DTYPE = np.dtype([
+    ('t', np.float64),
+    ('defender_pos', np.float64, (3,)),
+    ('defender_rpy', np.float64, (3,)),
+    ('attacker_pos', np.float64, (3,)),
+    ('attacker_rpy', np.float64, (3,)),
+    ('base_pos', np.float64, (3,)),    # optional in the JSON
+])
+
+# Column of each field in the (N, 16) float view
+_FIELD_COLUMNS = {name: EPISODE_DTYPE.fields[name][1] // 8 for name in EPISODE_DTYPE.names}
+
+# Per-frame (agent, field) vectors that every frame must have
+_FRAME_FIELDS = (
+    ('defender', 'pos'), ('defender', 'rpy'),
+    ('attacker', 'pos'), ('attacker', 'rpy'),
+)
+
+# Both agents of a frame dict in one call (_pack_frames)
+_get_agents = operator.itemgetter('defender', 'attacker')
+
+
+def _grow_frames(buf: np.ndarray, n: int, capacity: int):
+    """Return a zeroed EPISODE_DTYPE buffer of capacity rows holding buf[:n], and its float view."""
+    new = np.zeros(capacity, dtype=EPISODE_DTYPE)
+    if buf is not None:
+        new[:n] = buf[:n]
+    return new, new.view(np.float64).reshape(capacity, -1)
+
+
+def _finish_frames(buf: np.ndarray, n: int, has_base: bool) -> Dict[str, Any]:
+    """Trim the packed buffer to n frames and expose each field under its own key."""
+    frames_arr = buf[:n] if n == len(buf) else buf[:n].copy()
+    packed = {name: frames_arr[name] for name in EPISODE_DTYPE.names}
+    if not has_base:
+        packed['base_pos'] = None
+    packed['frames_arr'] = frames_arr
+    packed['n_frames'] = n
+    return packed
+
+
+def _pack_frames(frames, capacity: int = 1024) -> Dict[str, Any]:
+    """
+    Pack frame dicts into one EPISODE_DTYPE array, consuming them one at a time.
+
+    Args:
+        frames: Iterable of frame dictionaries
+        capacity: Initial number of rows (buffer doubles when full)
+
+    Returns:
+        Dictionary with 'n_frames', 'frames_arr' (N,) structured array and
+        its fields as views: 't' (N,) and '<agent>_<field>' (N, 3).
+        'base_pos' is None unless every frame has a base position.
+    """
+    capacity = max(1, capacity)
+    buf, flat = _grow_frames(None, 0, capacity)
+    def_pos = _FIELD_COLUMNS['defender_pos']
+    def_rpy = _FIELD_COLUMNS['defender_rpy']
+    att_pos = _FIELD_COLUMNS['attacker_pos']
+    att_rpy = _FIELD_COLUMNS['attacker_rpy']
+    base_col = _FIELD_COLUMNS['base_pos']
+    has_base = True
+
+    n = 0
+    for frame in frames:
+        if n == capacity:
+            capacity *= 2
+            buf, flat = _grow_frames(buf, n, capacity)
+
+        row = flat[n]
+        row[0] = frame.get('t', 0.0)
+        defender, attacker = _get_agents(frame)
+        row[def_pos:def_pos + 3] = defender['pos']
+        row[def_rpy:def_rpy + 3] = defender['rpy']
+        row[att_pos:att_pos + 3] = attacker['pos']
+        row[att_rpy:att_rpy + 3] = attacker['rpy']
+        base = frame.get('base')
+        if base is not None:
+            row[base_col:base_col + 3] = base['pos']
+        else:
+            has_base = False
+        n += 1
+
+    return _finish_frames(buf, n, has_base)
+
 
+# One monitor-loop progress line: frame index, then actual/waypoint position
+# of the defender and of the attacker
+_PROGRESS_FMT = (b"[%3d] DEF: (%7.2f,%7.2f,%7.2f) | WP:(%7.2f,%7.2f,%7.2f) || "
+                 b"ATT: (%7.2f,%7.2f,%7.2f) | WP:(%7.2f,%7.2f,%7.2f)\n")
 
-def load_episode(json_file: str) -> Dict[str, Any]:
+# ijson prefix of every number load_episode keeps, mapped to its first column
+_STREAM_PREFIXES = {
+    f'frames.item.{agent}.{field}.item': _FIELD_COLUMNS[f'{agent}_{field}']
+    for agent, field in _FRAME_FIELDS + (('base', 'pos'),)
+}
+
+# First column of each vector every frame must have, and the name of each
+# streamed vector for error messages
+_STREAM_REQUIRED = tuple(_FIELD_COLUMNS[f'{agent}_{field}'] for agent, field in _FRAME_FIELDS)
+_STREAM_NAMES = {start: prefix[len('frames.item.'):-len('.item')]
+                 for prefix, start in _STREAM_PREFIXES.items()}
+
+
+def _stream_frames(f, capacity: int = 1024):
+    """
+    Pack frames straight from ijson parse events (same result as _pack_frames).
+
+    Only 't' and the pos/rpy numbers are kept; every other per-frame field
+    (vel, obs, action, ...) is skipped without ever being built into
+    Python objects, and no per-frame dict is created. The metadata is
+    built in the same pass, so the file is parsed once.
+
+    Args:
+        f: Episode JSON file opened in binary mode
+        capacity: Initial number of rows (buffer doubles when full). If the
+            metadata comes before the frames, its total_frames is used instead.
+
+    Returns:
+        (metadata or None if the file has none, packed frame dict)
+
+    Raises:
+        KeyError: If a frame lacks a defender/attacker pos or rpy
+        ValueError: If a pos/rpy vector does not have exactly 3 values
+    """
+    capacity = max(1, capacity)
+    buf, flat = _grow_frames(None, 0, capacity)
+    # Next column to fill per vector in the current frame
+    first_columns = {start: start for start in _STREAM_PREFIXES.values()}
+    columns = {}
+    base_col = _FIELD_COLUMNS['base_pos']
+    n_base_frames = 0
+    metadata = None
+
+    n = -1
+    for prefix, event, value in ijson.parse(f, use_float=True):
+        start = _STREAM_PREFIXES.get(prefix)
+        if start is not None:
+            col = columns[start]
+            # Never spill into the next field's columns
+            if col == start + 3:
+                raise ValueError(f"Frame {n}: {_STREAM_NAMES[start]} has more than 3 values")
+            flat[n, col] = value
+            columns[start] = col + 1
+        elif prefix == 'frames.item':
+            if event == 'start_map':
+                n += 1
+                if n == capacity:
+                    capacity *= 2
+                    buf, flat = _grow_frames(buf, n, capacity)
+                columns = first_columns.copy()
+            elif event == 'end_map':
+                # Same checks _pack_frames gets from the frame dict lookups
+                # and slice assignments
+                for start in _STREAM_REQUIRED:
+                    count = columns[start] - start
+                    if count == 0:
+                        raise KeyError(f"Frame {n}: missing {_STREAM_NAMES[start]}")
+                    if count != 3:
+                        raise ValueError(f"Frame {n}: {_STREAM_NAMES[start]} has {count} values, expected 3")
+                count = columns[base_col] - base_col
+                if count == 3:
+                    n_base_frames += 1
+                elif count:
+                    raise ValueError(f"Frame {n}: base.pos has {count} values, expected 3")
+        elif prefix == 'frames.item.t':
+            flat[n, 0] = value
+        elif prefix == 'metadata' or prefix.startswith('metadata.'):
+            if metadata is None:
+                metadata = ijson.ObjectBuilder()
+            metadata.event(event, value)
+            # Metadata seen before any frame: size the buffer from it
+            if (prefix == 'metadata' and event == 'end_map' and n < 0
+                    and metadata.value.get('total_frames')):
+                capacity = int(metadata.value['total_frames'])
+                buf, flat = _grow_frames(None, 0, capacity)
+
+    n += 1
+    return (None if metadata is None else metadata.value), _finish_frames(buf, n, n_base_frames == n)
+
+
+def _episode_cache_path(json_path: Path) -> Path:
+    """Binary sidecar cache next to an episode JSON (episode.json -> episode.json.npz)."""
+    return json_path.with_name(json_path.name + '.npz')
+
+
+def _source_key(source_stat: os.stat_result, version: int) -> np.ndarray:
+    """Identity of a cache's source: file mtime in ns, file size and producer version."""
+    return np.array([source_stat.st_mtime_ns, source_stat.st_size, version], dtype=np.int64)
+
+
+def load_episode_cache(json_path: Path, source_stat: os.stat_result, cache_path: Path = None,
+                       version: int = 0):
+    """
+    Read the packed frames from the .npz sidecar if it is up to date.
+
+    The sidecar is only used if it was built from a source file with
+    exactly the same mtime (ns) and size, by the same version of whatever
+    produced the episode from it.
+
+    Args:
+        json_path: Source file the cache was built from
+        source_stat: Current os.stat() of json_path
+        cache_path: Sidecar to read (default: _episode_cache_path(json_path))
+        version: Version of the code that turns the source into the episode
+            (0 for episode JSON, CONVERTER_VERSION for converted waypoints)
+
+    Returns:
+        (metadata, packed frame dict) or None if there is no usable cache
+    """
+    if cache_path is None:
+        cache_path = _episode_cache_path(json_path)
+    try:
+        with np.load(cache_path, allow_pickle=False) as z:
+            if not np.array_equal(z['source_key'], _source_key(source_stat, version)):
+                return None
+            frames_arr = z['frames']
+            has_base = bool(z['has_base'])
+            metadata = _fast_json.loads(z['metadata'].item())
+    except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile):
+        # Missing, truncated or corrupt sidecar: ignore it and rebuild
+        return None
+
+    # Written by an older frame layout: ignore and rebuild
+    if frames_arr.dtype != EPISODE_DTYPE or len(frames_arr) == 0:
+        return None
+
+    return metadata, _finish_frames(frames_arr, len(frames_arr), has_base)
+
+
+def save_episode_cache(json_path: Path, source_stat: os.stat_result, metadata: Dict[str, Any],
+                       episode_data: Dict[str, Any], cache_path: Path = None, version: int = 0):
+    """
+    Write the packed frames and metadata to the .npz sidecar (best effort).
+
+    source_stat should be taken before the source was read, so a source
+    rewritten while it was being parsed never matches the cache. cache_path
+    and version are as for load_episode_cache.
+    """
+    if cache_path is None:
+        cache_path = _episode_cache_path(json_path)
+    tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+    try:
+        # Write then rename, so a half-written cache is never picked up
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                frames=episode_data['frames_arr'],
+                source_key=_source_key(source_stat, version),
+                has_base=np.array(episode_data['base_pos'] is not None),
+                metadata=np.array(_fast_json.dumps(metadata)),
+            )
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"⚠️  Could not write episode cache {cache_path.name}: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def load_episode(json_file: str, use_cache: bool = False) -> Dict[str, Any]:
     """
     Load episode data from JSON file.
 
+    Frames are packed into one EPISODE_DTYPE structured array rather than
+    kept as dicts. With ijson installed they are streamed from disk, so the
+    full document is never held in memory.
+
+    With use_cache the packed frames are also saved to a binary sidecar
+    (<file>.json.npz) next to the JSON, which later loads read instead of
+    reparsing the JSON as long as the JSON file's mtime and size are
+    unchanged. The JSON stays the source of truth.
+
     Args:
         json_file: Path to episode JSON file
+        use_cache: Read/write the .npz sidecar cache (default: False)
 
     Returns:
-        Episode data dictionary
+        Episode data dictionary: 'metadata', 'n_frames', 'frames_arr' and
+        its field views 't' (N,) and 'defender_pos', 'defender_rpy',
+        'attacker_pos', 'attacker_rpy', 'base_pos' (N, 3) (see _pack_frames)
 
     Raises:
         FileNotFoundError: If file doesn't exist
-        json.JSONDecodeError: If JSON is invalid
+        ValueError: If JSON is invalid (json/orjson/ijson errors all subclass it)
     """
     json_path = Path(json_file)
 
-    if not json_path.exists():
-        raise FileNotFoundError(f"Episode file not found: {json_file}")
+    try:
+        source_stat = json_path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Episode file not found: {json_file}") from None
 
     print(f"\nLoading episode from: {json_path.name}")
 
-    with open(json_path, 'r') as f:
-        episode_data = json.load(f)
+    cached = load_episode_cache(json_path, source_stat) if use_cache else None
+    if cached is not None:
+        metadata, episode_data = cached
+        print(f"  (from cache {_episode_cache_path(json_path).name})")
+    elif ijson is None:
+        raw = _fast_json.load_file(json_path)
+        metadata = raw.get('metadata')
+        frames = raw.get('frames')
+        if metadata is None or frames is None:
+            raise ValueError("Invalid episode format: missing 'metadata' or 'frames'")
+        episode_data = _pack_frames(frames, len(frames))
+        del raw, frames
+    else:
+        with open(json_path, 'rb') as f:
+            metadata, episode_data = _stream_frames(f)
 
     # Validate structure
-    if 'metadata' not in episode_data or 'frames' not in episode_data:
+    if metadata is None or episode_data['n_frames'] == 0:
         raise ValueError("Invalid episode format: missing 'metadata' or 'frames'")
 
-    metadata = episode_data['metadata']
-    frames = episode_data['frames']
+    episode_data['metadata'] = metadata
+
+    if use_cache and cached is None:
+        save_episode_cache(json_path, source_stat, metadata, episode_data)
+
+    print_episode_summary(episode_data)
+
+    return episode_data
+
+
+def episode_from_dict(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Pack an episode that is already in memory, as load_episode does for a file.
+
+    Args:
+        raw: Episode dictionary with 'metadata' and 'frames' (frame dicts)
+
+    Returns:
+        Episode data dictionary in the same layout as load_episode
+
+    Raises:
+        ValueError: If 'metadata' or 'frames' is missing or empty
+    """
+    metadata = raw.get('metadata')
+    frames = raw.get('frames')
+    if metadata is None or not frames:
+        raise ValueError("Invalid episode format: missing 'metadata' or 'frames'")
+
+    episode_data = _pack_frames(frames, len(frames))
+    episode_data['metadata'] = metadata
+
+    print_episode_summary(episode_data)
+
+    return episode_data
+
 
+def print_episode_summary(episode_data: Dict[str, Any]):
+    """Print the summary shown after an episode is loaded."""
+    metadata = episode_data['metadata']
     print(f"✓ Loaded Episode {metadata['episode']}")
     print(f"  Outcome: {metadata['outcome']}")
     print(f"  Total Reward: {metadata['total_reward']:.2f}")
-    print(f"  Total Frames: {len(frames)}")
-    print(f"  Duration: {frames[-1]['t']:.2f}s")
+    print(f"  Total Frames: {episode_data['n_frames']}")
+    print(f"  Duration: {episode_data['t'][-1]:.2f}s")
     print(f"  Coordinate System: {metadata.get('coordinate_system', 'Unknown')}")
     print(f"  Units: {metadata.get('converted_units', 'meters')}")
 
-    return episode_data
+
+def get_scaled_start_positions(episode_data: Dict[str, Any], config: VisualizationConfig,
+                               frame_idx: int = 0) -> Dict[str, Tuple[float, float, float]]:
+    """
+    Positions of one frame with X/Y scaled and Z NOT scaled (as used for
+    spawn points and markers).
+
+    Results are cached in episode_data per (frame_idx, SCALE_FACTOR), so
+    settings.json and the start markers share one computation.
+
+    Args:
+        episode_data: Episode data from load_episode
+        config: Visualization configuration
+        frame_idx: Frame to read (default: 0)
+
+    Returns:
+        Dictionary mapping 'defender', 'attacker' and (if present) 'base'
+        to (x, y, z) tuples
+    """
+    cache = episode_data.setdefault('_scaled_start_positions', {})
+    key = (frame_idx, config.SCALE_FACTOR)
+    if key not in cache:
+        scale_xy = np.array([config.SCALE_FACTOR, config.SCALE_FACTOR, 1.0])
+        positions = {}
+        for agent in ('defender', 'attacker', 'base'):
+            arr = episode_data[f'{agent}_pos']
+            if arr is not None:
+                positions[agent] = tuple((arr[frame_idx] * scale_xy).tolist())
+        cache[key] = positions
+    return cache[key]
 
 
 def update_settings_with_frame_0(episode_data: Dict[str, Any], config: VisualizationConfig, settings_path: str = "/tmp/AirSim/settings.json"):
@@ -83,20 +485,22 @@ def update_settings_with_frame_0(episode_data: Dict[str, Any], config: Visualiza
         episode_data: Episode data dictionary
         config: Visualization configuration
         settings_path: Path to settings.json file (default: ~/Documents/AirSim/settings.json)
+
+    Returns:
+        True if settings.json was written (Unreal must be restarted), False
+        if it already held these positions or could not be updated
     """
     try:
-        frames = episode_data['frames']
-        if not frames:
+        if not episode_data['n_frames']:
             print("⚠️  No frames found in episode data")
-            return
-
-        frame_0 = frames[0]
+            return False
 
         # Load existing settings
         settings_file = Path(settings_path).expanduser()
+        existing_settings = None
         if settings_file.exists():
-            with open(settings_file, 'r') as f:
-                settings = json.load(f)
+            existing_settings = _fast_json.load_file(settings_file)
+            settings = copy.deepcopy(existing_settings)
         else:
             # Create minimal settings if doesn't exist
             settings = {
@@ -111,48 +515,54 @@ def update_settings_with_frame_0(episode_data: Dict[str, Any], config: Visualiza
         if "Vehicles" not in settings:
             settings["Vehicles"] = {}
 
+        # No flipping - spawn positions are perfect as-is (X/Y scaled, Z NOT scaled)
+        start_positions = get_scaled_start_positions(episode_data, config)
+
         # Update defender position
-        if "defender" in frame_0:
-            # No flipping - spawn positions are perfect as-is
-            defender_raw = frame_0["defender"]["pos"]
-            defender_rpy = frame_0["defender"]["rpy"]
-
-            # AirSim uses meters
-            settings["Vehicles"]["Defender"] = {
-                "VehicleType": "SimpleFlight",
-                "X": defender_raw[0] * config.SCALE_FACTOR,   # X as-is
-                "Y": defender_raw[1] * config.SCALE_FACTOR,   # Y as-is
-                "Z": defender_raw[2],  # Z NOT scaled
-                "Yaw": defender_rpy[2]  # Use yaw from RPY
-            }
+        defender_raw = episode_data["defender_pos"][0].tolist()
+        defender_rpy = episode_data["defender_rpy"][0].tolist()
+        def_x, def_y, def_z = start_positions["defender"]
+
+        # AirSim uses meters
+        settings["Vehicles"]["Defender"] = {
+            "VehicleType": "SimpleFlight",
+            "X": def_x,
+            "Y": def_y,
+            "Z": def_z,
+            "Yaw": defender_rpy[2]  # Use yaw from RPY
+        }
 
         # Update attacker position
-        if "attacker" in frame_0:
-            # No flipping - spawn positions are perfect as-is
-            attacker_raw = frame_0["attacker"]["pos"]
-            attacker_rpy = frame_0["attacker"]["rpy"]
-
-            # AirSim uses meters
-            settings["Vehicles"]["Attacker"] = {
-                "VehicleType": "SimpleFlight",
-                "X": attacker_raw[0] * config.SCALE_FACTOR,   # X as-is
-                "Y": attacker_raw[1] * config.SCALE_FACTOR,   # Y as-is
-                "Z": attacker_raw[2],  # Z NOT scaled
-                "Yaw": attacker_rpy[2]  # Use yaw from RPY
-            }
+        attacker_raw = episode_data["attacker_pos"][0].tolist()
+        attacker_rpy = episode_data["attacker_rpy"][0].tolist()
+        att_x, att_y, att_z = start_positions["attacker"]
+
+        # AirSim uses meters
+        settings["Vehicles"]["Attacker"] = {
+            "VehicleType": "SimpleFlight",
+            "X": att_x,
+            "Y": att_y,
+            "Z": att_z,
+            "Yaw": attacker_rpy[2]  # Use yaw from RPY
+        }
+
+        # Nothing to do if the file already holds these positions (no
+        # write, and no needless Unreal restart)
+        if settings == existing_settings:
+            print(f"\n✓ settings.json already has the frame 0 positions ({settings_file})")
+            return False
 
         # Write updated settings
         settings_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(settings_file, 'w') as f:
-            json.dump(settings, f, indent=2)
+        _fast_json.dump_file(settings, settings_file, indent=True)
 
         print(f"\n{'='*60}")
         print(f"SETTINGS.JSON UPDATE - CRITICAL FOR ALIGNMENT")
         print(f"{'='*60}")
         print(f"File: {settings_file}")
         print(f"\nFrame 0 positions (RAW from episode data):")
-        print(f"  Defender: {frame_0['defender']['pos']}")
-        print(f"  Attacker: {frame_0['attacker']['pos']}")
+        print(f"  Defender: {defender_raw}")
+        print(f"  Attacker: {attacker_raw}")
         print(f"\nTransformation settings:")
         print(f"  Scale Factor: {config.SCALE_FACTOR}x")
         print(f"  Invert Z-axis: {config.INVERT_Z}")
@@ -165,9 +575,63 @@ def update_settings_with_frame_0(episode_data: Dict[str, Any], config: Visualiza
               f"Z={settings['Vehicles']['Attacker']['Z']:.3f} {'(negative = altitude in NED)' if settings['Vehicles']['Attacker']['Z'] < 0 else '⚠️ POSITIVE Z = BELOW GROUND!'}")
         print(f"\n⚠️  YOU MUST RESTART UNREAL for these positions to take effect!")
         print(f"{'='*60}\n")
+        return True
 
     except Exception as e:
         print(f"⚠️  Warning: Could not update settings.json: {e}")
+        return False
+
+
+def build_relative_paths(positions: List[np.ndarray], starts: List[airsim.Vector3r],
+                         scale: float) -> List[List[PathPoint]]:
+    """
+    Build flight paths that replay each drone's frame-to-frame movement in
+    the episode from its actual starting position.
+
+    Args:
+        positions: (N, 3) episode positions per drone
+        starts: Actual position of each drone for its first waypoint
+        scale: Scale factor applied to each movement
+
+    Returns:
+        One list of N waypoints per drone
+    """
+    paths = build_paths_multi(
+        np.stack(positions),
+        scale,
+        [(s.x_val, s.y_val, s.z_val) for s in starts]
+    )
+    return [to_path_points(path) for path in paths]
+
+
+def visual_path_array(positions: np.ndarray, scale: float) -> np.ndarray:
+    """
+    Trajectory line positions (X/Y scaled, Z NOT scaled - matches markers).
+
+    Args:
+        positions: (N, 3) episode positions
+        scale: Scale factor applied to X/Y
+
+    Returns:
+        (N, 3) float64 array (a new copy)
+    """
+    path = np.array(positions, dtype=np.float64)
+    path[:, :2] *= scale
+    return path
+
+
+def build_visual_path(positions: np.ndarray, scale: float) -> List[PathPoint]:
+    """
+    Build trajectory line points (X/Y scaled, Z NOT scaled - matches markers).
+
+    Args:
+        positions: (N, 3) episode positions
+        scale: Scale factor applied to X/Y
+
+    Returns:
+        List of N points
+    """
+    return to_path_points(visual_path_array(positions, scale))
 
 
 def visualize_episode(
@@ -176,7 +640,8 @@ def visualize_episode(
     start_frame: int = 0,
     end_frame: int = None,
     skip_takeoff: bool = False,
-    playback_speed: float = 1.0
+    playback_speed: float = 1.0,
+    quiet: bool = False
 ):
     """
     Visualize episode in AirSim.
@@ -188,10 +653,11 @@ def visualize_episode(
         end_frame: Ending frame index (default: last frame)
         skip_takeoff: If True, skip takeoff and start directly
         playback_speed: Playback speed multiplier
+        quiet: If True, skip the per-iteration waypoint progress lines
     """
-    frames = episode_data['frames']
-    if end_frame is None or end_frame > len(frames):
-        end_frame = len(frames)
+    n_frames = episode_data['n_frames']
+    if end_frame is None or end_frame > n_frames:
+        end_frame = n_frames
 
     print("\n" + "="*60)
     print(f"STARTING VISUALIZATION")
@@ -202,19 +668,16 @@ def visualize_episode(
 
     # Simple initialization
     print("\nConnecting to AirSim...")
-    client = airsim.MultirotorClient()
-    client.confirmConnection()
+    client = get_client()
     print("✓ Connected")
 
     # Enable API control and arm
     print("\nEnabling API control...")
-    client.enableApiControl(True, "Defender")
-    client.enableApiControl(True, "Attacker")
+    call_for_vehicles(client, 'enableApiControl', ["Defender", "Attacker"], True)
     print("✓ API control enabled")
 
     print("\nArming drones...")
-    client.armDisarm(True, "Defender")
-    client.armDisarm(True, "Attacker")
+    call_for_vehicles(client, 'armDisarm', ["Defender", "Attacker"], True)
     print("✓ Drones armed")
 
     # Clear all old markers/trajectories from previous runs
@@ -222,7 +685,7 @@ def visualize_episode(
     try:
         client.simFlushPersistentMarkers()
         print("✓ Cleared old markers")
-    except:
+    except Exception:
         print("✓ Marker clearing not supported (old AirSim version)")
 
     # Takeoff to get airborne
@@ -232,7 +695,8 @@ def visualize_episode(
     f1.join()
     f2.join()
     print("✓ Takeoff complete")
-    time.sleep(3)  # Longer wait for stabilization
+    # Wait for stabilization (up to the old fixed 3 seconds)
+    wait_until_settled(client, ["Defender", "Attacker"], timeout=3.0)
 
     # SIMPLE APPROACH: Use ACTUAL drone positions and build relative paths
     print("\n" + "="*60)
@@ -240,10 +704,10 @@ def visualize_episode(
     print("="*60)
 
     # Get where drones actually are after takeoff
-    def_state = client.getMultirotorState(vehicle_name="Defender")
-    att_state = client.getMultirotorState(vehicle_name="Attacker")
-    def_actual = def_state.kinematics_estimated.position
-    att_actual = att_state.kinematics_estimated.position
+    def_actual, att_actual = [
+        airsim.KinematicsState.from_msgpack(k).position
+        for k in call_for_vehicles(client, 'simGetGroundTruthKinematics', ["Defender", "Attacker"])
+    ]
 
     print(f"\n✓ ACTUAL Defender position: ({def_actual.x_val:.3f}, {def_actual.y_val:.3f}, {def_actual.z_val:.3f})")
     print(f"✓ ACTUAL Attacker position: ({att_actual.x_val:.3f}, {att_actual.y_val:.3f}, {att_actual.z_val:.3f})")
@@ -260,179 +724,89 @@ def visualize_episode(
         # Build complete path using RELATIVE movements (this makes drones follow correctly)
         print("\nBuilding flight paths using relative movements from episode data...")
 
-        # Colors for visualization
-        COLOR_DEFENDER = [0.0, 1.0, 0.0, 1.0]  # Green
-        COLOR_ATTACKER = [1.0, 0.0, 0.0, 1.0]  # Red
-        COLOR_BASE = [0.0, 0.5, 1.0, 1.0]      # Cyan
-
-        episode_frames = frames[start_frame:end_frame]
-
-        # Start with ACTUAL drone positions (this was working!)
-        defender_path = [airsim.Vector3r(def_actual.x_val, def_actual.y_val, def_actual.z_val)]
-        attacker_path = [airsim.Vector3r(att_actual.x_val, att_actual.y_val, att_actual.z_val)]
-
-        # Build relative movements between frames
-        for i in range(1, len(episode_frames)):
-            prev_frame = episode_frames[i-1]
-            curr_frame = episode_frames[i]
-
-            # Calculate RELATIVE movement (delta) between frames
-            def_delta_x = (curr_frame['defender']['pos'][0] - prev_frame['defender']['pos'][0]) * config.SCALE_FACTOR
-            def_delta_y = (curr_frame['defender']['pos'][1] - prev_frame['defender']['pos'][1]) * config.SCALE_FACTOR
-            def_delta_z = (curr_frame['defender']['pos'][2] - prev_frame['defender']['pos'][2]) * config.SCALE_FACTOR
-
-            att_delta_x = (curr_frame['attacker']['pos'][0] - prev_frame['attacker']['pos'][0]) * config.SCALE_FACTOR
-            att_delta_y = (curr_frame['attacker']['pos'][1] - prev_frame['attacker']['pos'][1]) * config.SCALE_FACTOR
-            att_delta_z = (curr_frame['attacker']['pos'][2] - prev_frame['attacker']['pos'][2]) * config.SCALE_FACTOR
-
-            # Apply relative movement to previous position
-            prev_def = defender_path[-1]
-            prev_att = attacker_path[-1]
-
-            defender_path.append(airsim.Vector3r(
-                prev_def.x_val + def_delta_x,
-                prev_def.y_val + def_delta_y,
-                prev_def.z_val + def_delta_z
-            ))
-            attacker_path.append(airsim.Vector3r(
-                prev_att.x_val + att_delta_x,
-                prev_att.y_val + att_delta_y,
-                prev_att.z_val + att_delta_z
-            ))
+        # Every later stage indexes the per-agent arrays packed by load_episode
+        def_pos_arr = episode_data['defender_pos'][start_frame:end_frame]
+        att_pos_arr = episode_data['attacker_pos'][start_frame:end_frame]
+
+        # Start with ACTUAL drone positions (this was working!) and apply the
+        # scaled RELATIVE movement (delta) between frames
+        defender_path, attacker_path = build_relative_paths(
+            [def_pos_arr, att_pos_arr], [def_actual, att_actual], config.SCALE_FACTOR)
 
         print(f"✓ Built paths: {len(defender_path)} waypoints (for drone flight)")
 
         # Build SEPARATE paths for visualization (X/Y scaled, Z NOT scaled - matches markers)
-        defender_path_visual = []
-        attacker_path_visual = []
-
-        for frame in episode_frames:
-            def_pos = frame['defender']['pos']
-            att_pos = frame['attacker']['pos']
-
-            defender_path_visual.append(airsim.Vector3r(
-                def_pos[0] * config.SCALE_FACTOR,  # Scale X
-                def_pos[1] * config.SCALE_FACTOR,  # Scale Y
-                def_pos[2]                          # Don't scale Z
-            ))
-            attacker_path_visual.append(airsim.Vector3r(
-                att_pos[0] * config.SCALE_FACTOR,  # Scale X
-                att_pos[1] * config.SCALE_FACTOR,  # Scale Y
-                att_pos[2]                          # Don't scale Z
-            ))
+        defender_path_visual = build_visual_path(def_pos_arr, config.SCALE_FACTOR)
+        attacker_path_visual = build_visual_path(att_pos_arr, config.SCALE_FACTOR)
 
         print(f"✓ Built visual paths: {len(defender_path_visual)} waypoints (for trajectory lines)\n")
 
         # Draw persistent markers for base, defender, and attacker
         print("Drawing position markers...")
 
-        # Get base position from first frame (scale X/Y but NOT Z)
-        base_pos = episode_frames[0]['base']['pos']
-        base_scaled = airsim.Vector3r(
-            base_pos[0] * config.SCALE_FACTOR,
-            base_pos[1] * config.SCALE_FACTOR,
-            base_pos[2]  # Don't scale Z
-        )
-
-        # Draw BASE marker (cyan sphere)
-        client.simPlotPoints(
-            points=[base_scaled],
-            color_rgba=[0.0, 1.0, 1.0, 1.0],  # Cyan
-            size=25.0,
-            duration=9999.0,
-            is_persistent=True
-        )
-        try:
-            client.simPlotStrings(
-                strings=["BASE"],
-                positions=[airsim.Vector3r(base_scaled.x_val, base_scaled.y_val, base_scaled.z_val - 2.0)],
-                scale=5.0,  # Larger text
-                color_rgba=[0.0, 1.0, 1.0, 1.0],  # Cyan
-                duration=9999.0
+        # Start positions of the first frame (scale X/Y but NOT Z), shared
+        # with update_settings_with_frame_0 when start_frame is 0
+        start_positions = get_scaled_start_positions(episode_data, config, start_frame)
+
+        # (label, key, color name, RGBA) for each persistent marker. The base
+        # marker is skipped when the episode has no base positions.
+        markers = [
+            ("BASE", 'base', "cyan", [0.0, 1.0, 1.0, 1.0]),
+            ("DEFENDER", 'defender', "green", COLOR_DEFENDER),
+            ("ATTACKER", 'attacker', "red", COLOR_ATTACKER),
+        ]
+        markers = [m for m in markers if m[1] in start_positions]
+
+        # Each marker needs its own sphere and label call (one color per call),
+        # but all six requests are sent before waiting on any of them so the
+        # round-trips overlap on the RPC connection
+        rpc = client.client
+        pending = []
+        for label, key, _, color in markers:
+            pos = airsim.Vector3r(*start_positions[key])
+            f_point = rpc.call_async('simPlotPoints', [pos], color, 25.0, 9999.0, True)
+            f_text = rpc.call_async(
+                'simPlotStrings',
+                [label],
+                [airsim.Vector3r(pos.x_val, pos.y_val, pos.z_val - 2.0)],
+                5.0,  # Larger text
+                color,
+                9999.0
             )
-            print(f"  ✓ BASE (cyan) at: ({base_scaled.x_val:.2f}, {base_scaled.y_val:.2f}, {base_scaled.z_val:.2f}) [text shown]")
-        except Exception as e:
-            print(f"  ✓ BASE (cyan) at: ({base_scaled.x_val:.2f}, {base_scaled.y_val:.2f}, {base_scaled.z_val:.2f}) [text not supported]")
-
-        # Draw DEFENDER starting marker (green sphere)
-        def_start_pos = episode_frames[0]['defender']['pos']
-        def_start_scaled = airsim.Vector3r(
-            def_start_pos[0] * config.SCALE_FACTOR,
-            def_start_pos[1] * config.SCALE_FACTOR,
-            def_start_pos[2]  # Don't scale Z
-        )
-        client.simPlotPoints(
-            points=[def_start_scaled],
-            color_rgba=[0.0, 1.0, 0.0, 1.0],  # Green
-            size=25.0,
-            duration=9999.0,
-            is_persistent=True
-        )
-        try:
-            client.simPlotStrings(
-                strings=["DEFENDER"],
-                positions=[airsim.Vector3r(def_start_scaled.x_val, def_start_scaled.y_val, def_start_scaled.z_val - 2.0)],
-                scale=5.0,  # Larger text
-                color_rgba=[0.0, 1.0, 0.0, 1.0],  # Green
-                duration=9999.0
-            )
-            print(f"  ✓ DEFENDER (green) at: ({def_start_scaled.x_val:.2f}, {def_start_scaled.y_val:.2f}, {def_start_scaled.z_val:.2f}) [text shown]")
-        except Exception as e:
-            print(f"  ✓ DEFENDER (green) at: ({def_start_scaled.x_val:.2f}, {def_start_scaled.y_val:.2f}, {def_start_scaled.z_val:.2f}) [text not supported]")
-
-        # Draw ATTACKER starting marker (red sphere)
-        att_start_pos = episode_frames[0]['attacker']['pos']
-        att_start_scaled = airsim.Vector3r(
-            att_start_pos[0] * config.SCALE_FACTOR,
-            att_start_pos[1] * config.SCALE_FACTOR,
-            att_start_pos[2]  # Don't scale Z
-        )
-        client.simPlotPoints(
-            points=[att_start_scaled],
-            color_rgba=[1.0, 0.0, 0.0, 1.0],  # Red
-            size=25.0,
-            duration=9999.0,
-            is_persistent=True
-        )
-        try:
-            client.simPlotStrings(
-                strings=["ATTACKER"],
-                positions=[airsim.Vector3r(att_start_scaled.x_val, att_start_scaled.y_val, att_start_scaled.z_val - 2.0)],
-                scale=5.0,  # Larger text
-                color_rgba=[1.0, 0.0, 0.0, 1.0],  # Red
-                duration=9999.0
-            )
-            print(f"  ✓ ATTACKER (red) at: ({att_start_scaled.x_val:.2f}, {att_start_scaled.y_val:.2f}, {att_start_scaled.z_val:.2f}) [text shown]")
-        except Exception as e:
-            print(f"  ✓ ATTACKER (red) at: ({att_start_scaled.x_val:.2f}, {att_start_scaled.y_val:.2f}, {att_start_scaled.z_val:.2f}) [text not supported]")
+            pending.append((f_point, f_text))
+
+        for (label, key, color_name, _), (f_point, f_text) in zip(markers, pending):
+            f_point.get()
+            try:
+                f_text.get()
+                text_status = "text shown"
+            except Exception as e:
+                text_status = "text not supported"
+            x, y, z = start_positions[key]
+            print(f"  ✓ {label} ({color_name}) at: ({x:.2f}, {y:.2f}, {z:.2f}) [{text_status}]")
         print()
 
         # Draw trajectory lines for both drones (using visual paths with unscaled Z)
         print("Drawing trajectory lines...")
 
-        # Defender trajectory (green line)
+        # Long paths are downsampled for drawing only (the drones still fly every waypoint)
+        defender_line = downsample_points(defender_path_visual, config.TRAJECTORY_MAX_DRAW_POINTS)
+        attacker_line = downsample_points(attacker_path_visual, config.TRAJECTORY_MAX_DRAW_POINTS)
+
+        # Defender (green) and attacker (red) lines, both sent before either
+        # reply is awaited
+        f_def_line = rpc.call_async('simPlotLineStrip', defender_line, COLOR_DEFENDER, 5.0, 9999.0, True)
+        f_att_line = rpc.call_async('simPlotLineStrip', attacker_line, COLOR_ATTACKER, 5.0, 9999.0, True)
+
         try:
-            client.simPlotLineStrip(
-                points=defender_path_visual,
-                color_rgba=[0.0, 1.0, 0.0, 1.0],  # Green
-                thickness=5.0,
-                duration=9999.0,
-                is_persistent=True
-            )
-            print(f"  ✓ DEFENDER trajectory (green) - {len(defender_path_visual)} waypoints")
+            f_def_line.get()
+            print(f"  ✓ DEFENDER trajectory (green) - {len(defender_path_visual)} waypoints ({len(defender_line)} drawn)")
         except Exception as e:
             print(f"  ✗ Failed to draw DEFENDER trajectory: {e}")
 
-        # Attacker trajectory (red line)
         try:
-            client.simPlotLineStrip(
-                points=attacker_path_visual,
-                color_rgba=[1.0, 0.0, 0.0, 1.0],  # Red
-                thickness=5.0,
-                duration=9999.0,
-                is_persistent=True
-            )
-            print(f"  ✓ ATTACKER trajectory (red) - {len(attacker_path_visual)} waypoints")
+            f_att_line.get()
+            print(f"  ✓ ATTACKER trajectory (red) - {len(attacker_path_visual)} waypoints ({len(attacker_line)} drawn)")
         except Exception as e:
             print(f"  ✗ Failed to draw ATTACKER trajectory: {e}")
 
@@ -446,10 +820,10 @@ def visualize_episode(
         base_velocity = 0.25  # m/s base speed (2x faster than previous 0.125)
         flight_velocity = base_velocity * config.SCALE_FACTOR  # Scale velocity with positions
 
-        # Calculate expected flight time
-        defender_distance = ((defender_path[-1].x_val - defender_path[0].x_val)**2 +
-                            (defender_path[-1].y_val - defender_path[0].y_val)**2 +
-                            (defender_path[-1].z_val - defender_path[0].z_val)**2)**0.5
+        # Calculate expected flight time (straight-line start to end)
+        d = defender_path[-1]
+        s = defender_path[0]
+        defender_distance = float(np.linalg.norm([d.x_val - s.x_val, d.y_val - s.y_val, d.z_val - s.z_val]))
         expected_time = defender_distance / flight_velocity
 
         print(f"\n{'='*60}")
@@ -467,8 +841,8 @@ def visualize_episode(
         f_def = client.moveOnPathAsync(
             path=defender_path,
             velocity=flight_velocity,
-            drivetrain=airsim.DrivetrainType.MaxDegreeOfFreedom,
-            yaw_mode=airsim.YawMode(is_rate=False, yaw_or_rate=0),
+            drivetrain=PATH_DRIVETRAIN,
+            yaw_mode=PATH_YAW_MODE,
             lookahead=1.0,  # 1 meter lookahead for precise waypoints
             adaptive_lookahead=0,  # Disable adaptive - follow path exactly
             vehicle_name="Defender"
@@ -477,16 +851,27 @@ def visualize_episode(
         f_att = client.moveOnPathAsync(
             path=attacker_path,
             velocity=flight_velocity,
-            drivetrain=airsim.DrivetrainType.MaxDegreeOfFreedom,
-            yaw_mode=airsim.YawMode(is_rate=False, yaw_or_rate=0),
+            drivetrain=PATH_DRIVETRAIN,
+            yaw_mode=PATH_YAW_MODE,
             lookahead=1.0,  # 1 meter lookahead for precise waypoints
             adaptive_lookahead=0,  # Disable adaptive - follow path exactly
             vehicle_name="Attacker"
         )
 
-        # Monitor progress and draw visualizations while drones fly
-        defender_trajectory = []
-        attacker_trajectory = []
+        # ABSOLUTE waypoint positions from JSON (scaled) for the progress print
+        def_json_scaled_all = (def_pos_arr * config.SCALE_FACTOR).tolist()
+        att_json_scaled_all = (att_pos_arr * config.SCALE_FACTOR).tolist()
+
+        # Episode time of each frame relative to the first; the progress
+        # print shows the frame matching elapsed (speed-adjusted) wall time
+        frame_times = episode_data['t'][start_frame:end_frame] - episode_data['t'][start_frame]
+
+        # Episodes without timing (old-format waypoints) have t = 0 on every
+        # frame, which would map all of playback to the last frame; advance
+        # one frame per 20Hz monitor tick instead
+        monitor_tick = 0.05  # seconds (20Hz)
+        if len(frame_times) > 1 and frame_times[-1] <= 0:
+            frame_times = np.arange(len(frame_times)) * monitor_tick
 
         print("Drones flying smooth interpolated paths...\n")
 
@@ -495,88 +880,146 @@ def visualize_episode(
         final_att = attacker_path[-1]
 
         # Monitor until both drones reach their final positions
-        def distance(pos, target):
-            return ((pos.x_val - target.x_val)**2 +
-                    (pos.y_val - target.y_val)**2 +
-                    (pos.z_val - target.z_val)**2)**0.5
-
-        max_iterations = 10000  # Safety limit
-        iteration = 0
-
-        # Track which waypoint we should be near (estimate based on time)
-        waypoint_index = 0
-
-        while iteration < max_iterations:
-            # Get current positions
-            def_state = client.getMultirotorState(vehicle_name="Defender")
-            att_state = client.getMultirotorState(vehicle_name="Attacker")
-            def_actual = def_state.kinematics_estimated.position
-            att_actual = att_state.kinematics_estimated.position
-
-            # Store trajectory points
-            defender_trajectory.append([def_actual.x_val, def_actual.y_val, def_actual.z_val])
-            attacker_trajectory.append([att_actual.x_val, att_actual.y_val, att_actual.z_val])
-
-            # Show waypoint progress for ALL frames - display ABSOLUTE positions from JSON
-            if iteration < len(episode_frames):
-                frame = episode_frames[iteration]
-
-                # Get ABSOLUTE positions from JSON (scaled)
-                def_json_pos = frame['defender']['pos']
-                att_json_pos = frame['attacker']['pos']
-
-                def_json_scaled = (def_json_pos[0] * config.SCALE_FACTOR,
-                                  def_json_pos[1] * config.SCALE_FACTOR,
-                                  def_json_pos[2] * config.SCALE_FACTOR)
-                att_json_scaled = (att_json_pos[0] * config.SCALE_FACTOR,
-                                  att_json_pos[1] * config.SCALE_FACTOR,
-                                  att_json_pos[2] * config.SCALE_FACTOR)
-
-                print(f"[{iteration:3d}] DEF: ({def_actual.x_val:7.2f},{def_actual.y_val:7.2f},{def_actual.z_val:7.2f}) | "
-                      f"WP:({def_json_scaled[0]:7.2f},{def_json_scaled[1]:7.2f},{def_json_scaled[2]:7.2f}) || "
-                      f"ATT: ({att_actual.x_val:7.2f},{att_actual.y_val:7.2f},{att_actual.z_val:7.2f}) | "
-                      f"WP:({att_json_scaled[0]:7.2f},{att_json_scaled[1]:7.2f},{att_json_scaled[2]:7.2f})")
-
-            # Check if both drones reached their final positions (within 1 meter for more accuracy)
-            def_dist = distance(def_actual, final_def)
-            att_dist = distance(att_actual, final_att)
-
-
-            if def_dist < 1.0 and att_dist < 1.0:
-                # Calculate distance between drones
-                drone_dist = ((def_actual.x_val - att_actual.x_val)**2 +
-                             (def_actual.y_val - att_actual.y_val)**2 +
-                             (def_actual.z_val - att_actual.z_val)**2)**0.5
-
-                print(f"\n✓ Both drones near final positions!")
-                print(f"  Defender: ({def_actual.x_val:.2f}, {def_actual.y_val:.2f}, {def_actual.z_val:.2f}) - {def_dist:.2f}m from target")
-                print(f"  Attacker: ({att_actual.x_val:.2f}, {att_actual.y_val:.2f}, {att_actual.z_val:.2f}) - {att_dist:.2f}m from target")
-                print(f"  Distance between drones: {drone_dist:.2f}m")
-                print(f"  Expected final distance: 0.49m")
-                break
-
-            time.sleep(0.05)  # Update visualization at 20Hz
-            iteration += 1
+        # Row 0 = Defender, row 1 = Attacker; cur_positions is reused every iteration
+        final_positions = np.array([
+            [final_def.x_val, final_def.y_val, final_def.z_val],
+            [final_att.x_val, final_att.y_val, final_att.z_val]
+        ])
+        cur_positions = np.empty((2, 3))
+        offsets = np.empty_like(cur_positions)
+
+        # Safety limit on monitor iterations: 1.5x the time needed to fly the
+        # longer of the two paths (their actual length, not the straight-line
+        # distance above) plus 10s, instead of a fixed 10000 ticks
+        longest_path = config.SCALE_FACTOR * max(
+            float(np.linalg.norm(np.diff(arr, axis=0), axis=1).sum()) for arr in (def_pos_arr, att_pos_arr))
+        max_iterations = int(longest_path / flight_velocity / monitor_tick * 1.5) + 200
+
+        # Monitor progress while drones fly. Only the current positions are
+        # kept: the flown trajectory was never read afterwards, so memory
+        # stays constant however long the flight is.
+
+        # Progress lines are preformatted bytes (printf-style %-formatting) and
+        # written to stdout in batches, not one print per iteration
+        progress_lines = []
+        PROGRESS_FLUSH_EVERY = 20
+
+        def flush_progress():
+            if progress_lines:
+                data = b"".join(progress_lines)
+                progress_lines.clear()
+                sys.stdout.flush()  # keep ordering with earlier print() output
+                out = getattr(sys.stdout, 'buffer', None)
+                if out is None:
+                    sys.stdout.write(data.decode())
+                else:
+                    out.write(data)
+                    out.flush()
+
+        stop_event = threading.Event()
+
+        def monitor(monitor_client):
+            # Both requests are sent before waiting on either, so the two
+            # round-trips overlap on the one RPC connection. Ground-truth
+            # kinematics is also a much smaller reply than the full multirotor state.
+            rpc = monitor_client.client
+            last_frame_idx = -1
+            t0 = time.monotonic()
+
+            # Fixed 20Hz schedule: each tick sleeps only for what is left of
+            # its 50ms slot, so RPC latency doesn't stretch the period
+            tick = monitor_tick
+            next_tick = t0
+
+            for iteration in range(max_iterations):
+                # Get current positions
+                f_def_kin = rpc.call_async('simGetGroundTruthKinematics', "Defender")
+                f_att_kin = rpc.call_async('simGetGroundTruthKinematics', "Attacker")
+                def_actual = airsim.KinematicsState.from_msgpack(f_def_kin.get()).position
+                att_actual = airsim.KinematicsState.from_msgpack(f_att_kin.get()).position
+
+                # Current positions (row 0 = Defender, row 1 = Attacker)
+                cur_positions[0] = (def_actual.x_val, def_actual.y_val, def_actual.z_val)
+                cur_positions[1] = (att_actual.x_val, att_actual.y_val, att_actual.z_val)
+
+                # Show waypoint progress - display ABSOLUTE positions from JSON,
+                # once per frame as playback time reaches it (last frame whose
+                # time has passed)
+                frame_idx = int(np.searchsorted(
+                    frame_times, (time.monotonic() - t0) * playback_speed, side='right')) - 1
+                if not quiet and frame_idx != last_frame_idx:
+                    last_frame_idx = frame_idx
+                    def_json_scaled = def_json_scaled_all[frame_idx]
+                    att_json_scaled = att_json_scaled_all[frame_idx]
+
+                    progress_lines.append(_PROGRESS_FMT % (
+                        frame_idx,
+                        def_actual.x_val, def_actual.y_val, def_actual.z_val, *def_json_scaled,
+                        att_actual.x_val, att_actual.y_val, att_actual.z_val, *att_json_scaled
+                    ))
+                    if len(progress_lines) >= PROGRESS_FLUSH_EVERY:
+                        flush_progress()
+
+                # Check if both drones reached their final positions (within 1 meter for more accuracy).
+                # Compared as squared distances; square roots are only taken for the final report.
+                np.subtract(cur_positions, final_positions, out=offsets)
+                if np.einsum('ij,ij->i', offsets, offsets).max() < 1.0:
+                    def_dist, att_dist = np.linalg.norm(offsets, axis=1).tolist()
+                    # Calculate distance between drones
+                    drone_dist = float(np.linalg.norm(cur_positions[0] - cur_positions[1]))
+
+                    flush_progress()
+                    print(f"\n✓ Both drones near final positions!")
+                    print(f"  Defender: ({def_actual.x_val:.2f}, {def_actual.y_val:.2f}, {def_actual.z_val:.2f}) - {def_dist:.2f}m from target")
+                    print(f"  Attacker: ({att_actual.x_val:.2f}, {att_actual.y_val:.2f}, {att_actual.z_val:.2f}) - {att_dist:.2f}m from target")
+                    print(f"  Distance between drones: {drone_dist:.2f}m")
+                    print(f"  Expected final distance: 0.49m")
+                    break
+
+                # Wait for the next tick; returns early once the paths are done.
+                # A tick that overran starts the schedule afresh rather than
+                # firing a burst of catch-up iterations.
+                next_tick += tick
+                slack = next_tick - time.monotonic()
+                if slack < 0:
+                    next_tick -= slack
+                    slack = 0
+                if stop_event.wait(slack):
+                    break
+
+            flush_progress()
+
+        # Positions are sampled on a background thread while this thread just
+        # waits for the path futures. The RPC client is not thread-safe, so the
+        # monitor gets its own connection.
+        monitor_client = airsim.MultirotorClient()
+        monitor_client.confirmConnection()
+        monitor_thread = threading.Thread(target=monitor, args=(monitor_client,), daemon=True)
+        monitor_thread.start()
 
         # Wait for async operations to complete
-        f_def.join()
-        f_att.join()
+        try:
+            f_def.join()
+            f_att.join()
+        finally:
+            stop_event.set()
+            monitor_thread.join()
+            monitor_client.client.close()
 
         print("✓ Smooth flight paths completed!")
 
         # Cancel any remaining movement commands to ensure clean landing
         client.cancelLastTask("Defender")
         client.cancelLastTask("Attacker")
-        time.sleep(0.5)
 
         # Final frame
         print("\n" + "="*60)
         print("PLAYBACK COMPLETE")
         print("="*60)
 
-        # Wait a bit before landing
-        print("\nWaiting 2 seconds before landing...")
-        time.sleep(2)
+        # Let the drones come to rest before landing (at most the old 2.5s of waits)
+        print("\nWaiting for drones to settle before landing...")
+        wait_until_settled(client, ["Defender", "Attacker"], timeout=2.5)
 
     except KeyboardInterrupt:
         print("\n\n⚠️  Visualization interrupted by user")
@@ -595,12 +1038,10 @@ def visualize_episode(
             f1.join()
             f2.join()
 
-            client.armDisarm(False, "Defender")
-            client.armDisarm(False, "Attacker")
-            client.enableApiControl(False, "Defender")
-            client.enableApiControl(False, "Attacker")
+            call_for_vehicles(client, 'armDisarm', ["Defender", "Attacker"], False)
+            call_for_vehicles(client, 'enableApiControl', ["Defender", "Attacker"], False)
             print("✓ Landed and disarmed")
-        except:
+        except Exception:
             print("⚠️  Could not land properly")
             client.reset()
 
@@ -623,6 +1064,9 @@ Examples:
 
   # Skip takeoff (if drones already airborne)
   python visualize_episode.py ../data/episodes/episode_0001.json --no-takeoff
+
+  # Keep a binary cache of the parsed episode next to the JSON (faster reloads)
+  python visualize_episode.py ../data/episodes/episode_0001.json --cache
         """
     )
 
@@ -685,11 +1129,23 @@ Examples:
         help='Path to AirSim settings.json to update (default: ~/Documents/AirSim/settings.json)'
     )
 
+    parser.add_argument(
+        '--quiet',
+        action='store_true',
+        help='Do not print per-waypoint progress during playback'
+    )
+
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help='Read/write a <file>.json.npz cache beside the episode JSON, so later runs skip parsing it'
+    )
+
     args = parser.parse_args()
 
     # Load episode first
     try:
-        episode_data = load_episode(args.episode_file)
+        episode_data = load_episode(args.episode_file, use_cache=args.cache)
     except Exception as e:
         print(f"\n⚠️  ERROR loading episode: {e}")
         sys.exit(1)
@@ -721,8 +1177,10 @@ Examples:
         start_frame=args.start_frame,
         end_frame=args.end_frame,
         skip_takeoff=args.no_takeoff,
-        playback_speed=args.speed
+        playback_speed=args.speed,
+        quiet=args.quiet
     )
+    release_client()
 
     print("\n✓ Visualization complete!")
 
@@ -19,22 +19,36 @@ Date: 2025
 
 import sys
 import argparse
+import hashlib
 from pathlib import Path
-import tempfile
 import os
+import tempfile
 import airsim
 import time
+import threading
+import numpy as np
 
 # Add scripts directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from convert_waypoints_to_episode import convert_waypoints_to_episode
-from visualize_episode import update_settings_with_frame_0, load_episode
-from config import VisualizationConfig, print_config_summary, auto_configure_from_metadata, transform_position
+from convert_waypoints_to_episode import convert_waypoints_to_episode_dict, write_episode_json
+from visualize_episode import (update_settings_with_frame_0, episode_from_dict, visual_path_array,
+                               get_client, release_client,
+                               COLOR_DEFENDER, COLOR_ATTACKER, PATH_DRIVETRAIN, PATH_YAW_MODE)
+from _pathkernels import PathPoint, to_path_points, to_wire_points, simplify_path
+from multi_agent_runner import call_for_vehicles, wait_until_settled, wait_until_landed
+from config import VisualizationConfig, print_config_summary, auto_configure_from_metadata, downsample_points
+
+# The model is never rotated; the quaternion is only read when a pose is sent
+_IDENTITY_Q = airsim.to_quaternion(0.0, 0.0, 0.0)
+
+# Fingerprint of the markers left in the scene by the last --reuse-markers run.
+# Only valid while that Unreal session is running (see forget_markers).
+MARKER_DIGEST_FILE = Path(tempfile.gettempdir()) / "airsim_vis_markers.digest"
 
 
 def spawn_fbx_model(client: airsim.MultirotorClient, position: airsim.Vector3r,
-                    asset_name: str = "TankMesh", scale: float = 1.0):
+                    asset_name: str = "TankMesh", scale: float = 1.0, reuse: bool = False):
     """
     Spawn the FBX model at the specified position.
 
@@ -43,30 +57,43 @@ def spawn_fbx_model(client: airsim.MultirotorClient, position: airsim.Vector3r,
         position: Position to spawn the model
         asset_name: Name of the imported asset in Unreal (default: "TankMesh")
         scale: Scale factor for the model
+        reuse: If the model is already in the scene (left by an earlier
+            run), only move and rescale it instead of respawning
 
     Returns:
         Object name if successful, None if failed
     """
     object_name = "BaseTank"
 
-    # Try to destroy existing object first
-    try:
-        client.simDestroyObject(object_name)
-        time.sleep(0.1)
-    except:
-        pass
-
     # Pose at ground level (positive Z = down in NED, so 0.5 puts it slightly below to touch floor)
     pose = airsim.Pose(
         airsim.Vector3r(position.x_val, position.y_val, 0.5),
-        airsim.to_quaternion(0, 0, 0)
+        _IDENTITY_Q
     )
+    # Scale must be a Vector3r, not a float
+    scale_vec = airsim.Vector3r(scale, scale, scale)
+
+    if reuse:
+        try:
+            if client.simListSceneObjects(f"^{object_name}$"):
+                client.simSetObjectPose(object_name, pose, True)
+                client.simSetObjectScale(object_name, scale_vec)
+                print(f"  ✓ Reusing existing '{object_name}' as base model")
+                return object_name
+        except Exception as e:
+            print(f"  ⚠️  Could not reuse '{object_name}' ({e}), spawning a new one")
+
+    # Try to destroy existing object first (e.g. left over from an interrupted
+    # run). simDestroyObject only returns once the object is gone, so no
+    # extra wait is needed before spawning.
+    try:
+        client.simDestroyObject(object_name)
+    except Exception:
+        pass
 
     # Try spawning the FBX model
     try:
         print(f"  Attempting to spawn '{asset_name}' FBX model...")
-        # Scale must be a Vector3r, not a float
-        scale_vec = airsim.Vector3r(scale, scale, scale)
         success = client.simSpawnObject(object_name, asset_name, pose, scale_vec, False)
 
         if success:
@@ -84,49 +111,195 @@ def spawn_fbx_model(client: airsim.MultirotorClient, position: airsim.Vector3r,
 def update_model_position(client: airsim.MultirotorClient, object_name: str,
                          position: airsim.Vector3r):
     """
-    Update model object position.
+    Update model object position without waiting for the reply.
+
+    The pose request is only sent; a newer pose simply overrides it, so
+    callers updating every tick don't pay a round-trip each time. Only call
+    this with the name returned by spawn_fbx_model (skip updates when it
+    returned None); errors are not swallowed here.
 
     Args:
         client: AirSim client
-        object_name: Name of the model object
+        object_name: Name of the spawned model object
         position: New position
+
+    Returns:
+        Future for the request (call .get() to wait for it)
     """
     pose = airsim.Pose(
         airsim.Vector3r(position.x_val, position.y_val, 0.5),
-        airsim.to_quaternion(0, 0, 0)
+        _IDENTITY_Q
     )
+    return client.client.call_async('simSetObjectPose', object_name, pose, True)
+
+
+class BasePoseThread(threading.Thread):
+    """
+    Move the base model along its path at a fixed rate while the drones fly.
+
+    The path is spread evenly over the flight duration and resampled once,
+    up front, to one linearly interpolated position per tick, so the update
+    loop only indexes into that schedule. Updates are paced with
+    time.perf_counter at `rate` Hz however dense the episode log is, and at
+    most one pose request is in flight, so the simulator is never sent
+    poses faster than it applies them. Ticks where the model would move
+    less than `min_move` are skipped, so a slow or pausing base costs no
+    RPCs. The thread uses its own RPC connection (the client is not
+    thread-safe).
+    """
+
+    def __init__(self, object_name: str, base_path: np.ndarray, duration: float,
+                 rate: float = 30.0, min_move: float = 0.02):
+        """
+        Args:
+            object_name: Name of the spawned model object
+            base_path: (N, 3) base positions in AirSim coordinates
+            duration: Seconds over which to play the whole path
+            rate: Maximum pose updates per second
+            min_move: Smallest horizontal move (m) worth sending a pose for
+        """
+        super().__init__(daemon=True)
+        self.object_name = object_name
+        self.rate = rate
+        self.min_move = min_move
+        self.schedule = self._resample(np.asarray(base_path, dtype=np.float64),
+                                       max(int(duration * rate), 1) + 1)
+        self._stop_event = threading.Event()
+
+    @staticmethod
+    def _resample(path: np.ndarray, n: int) -> np.ndarray:
+        """Linearly interpolate an (N, 3) path to n evenly spaced positions."""
+        last = len(path) - 1
+        s = np.linspace(0.0, last, n)
+        idx = np.minimum(s.astype(np.intp), max(last - 1, 0))
+        frac = (s - idx)[:, None]
+        return path[idx] * (1.0 - frac) + path[np.minimum(idx + 1, last)] * frac
+
+    def run(self):
+        client = airsim.MultirotorClient()
+        client.confirmConnection()
+        schedule = self.schedule.tolist()
+        last = len(schedule) - 1
+        tick = 1.0 / self.rate
+        # Compare squared distances, so no square root per tick
+        min_move_sq = self.min_move * self.min_move
+        sent_x = sent_y = None
+        pending = None
+        idx = -1
+        try:
+            start = time.perf_counter()
+            next_tick = start
+            while idx < last:
+                new_idx = min(int((time.perf_counter() - start) * self.rate), last)
+                if new_idx != idx:
+                    idx = new_idx
+                    x, y, z = schedule[idx]
+                    # The model only moves in X/Y (update_model_position pins Z)
+                    if (sent_x is None or idx == last
+                            or (x - sent_x) ** 2 + (y - sent_y) ** 2 >= min_move_sq):
+                        if pending is not None:
+                            pending.get()
+                        pending = update_model_position(client, self.object_name, PathPoint(x, y, z))
+                        sent_x, sent_y = x, y
+
+                next_tick += tick
+                if self._stop_event.wait(max(0.0, next_tick - time.perf_counter())):
+                    break
+            if pending is not None:
+                pending.get()
+        finally:
+            client.client.close()
+
+    def stop(self):
+        """Stop updating and wait for the thread to exit."""
+        self._stop_event.set()
+        self.join()
+
+
+def flush_markers(client: airsim.MultirotorClient):
+    """Clear all persistent markers/trajectories (e.g. from previous runs)."""
+    print("\nClearing old visualizations...")
+    try:
+        client.simFlushPersistentMarkers()
+        print("✓ Cleared old markers")
+    except Exception:
+        print("✓ Marker clearing not supported (old AirSim version)")
+
+
+def forget_markers():
+    """
+    Drop the recorded marker fingerprint, so the next run draws its markers.
+
+    Call whenever the scene may have lost its markers (flush, Unreal restart).
+    """
     try:
-        client.simSetObjectPose(object_name, pose)
-    except:
-        pass  # Silently fail if object doesn't exist
+        MARKER_DIGEST_FILE.unlink()
+    except OSError:
+        pass
 
 
-def check_base_trajectory(frames: list, config: VisualizationConfig) -> bool:
+def markers_digest(path_arrays: dict, *settings) -> str:
+    """
+    Fingerprint of what the start markers and trajectory lines would draw.
+
+    Args:
+        path_arrays: Vehicle name -> (N, 3) drawn path array
+        *settings: Anything else that changes the drawing (flags, thickness)
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.blake2b(repr(settings).encode(), digest_size=16)
+    for vehicle in sorted(path_arrays):
+        digest.update(vehicle.encode())
+        digest.update(np.ascontiguousarray(path_arrays[vehicle], dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def get_vehicle_positions(client: airsim.MultirotorClient, vehicle_names: list) -> list:
+    """
+    Current pose positions of several vehicles, with the requests overlapped.
+
+    Args:
+        client: AirSim client
+        vehicle_names: Vehicles to query
+
+    Returns:
+        List of Vector3r positions, in vehicle_names order
+    """
+    poses = call_for_vehicles(client, 'simGetVehiclePose', vehicle_names)
+    return [airsim.Pose.from_msgpack(pose).position for pose in poses]
+
+
+def check_base_trajectory(base_positions: np.ndarray, config: VisualizationConfig) -> bool:
     """
     Check if base has a moving trajectory or is stationary.
 
     Args:
-        frames: List of frame dictionaries
+        base_positions: (N, 3) base positions from the episode (or None)
         config: Visualization configuration
 
     Returns:
         True if base moves, False if stationary
     """
-    if len(frames) < 2:
+    if base_positions is None or len(base_positions) < 2:
         return False
 
-    first_base = transform_position(frames[0]['base']['pos'], config)
+    # The transform to AirSim coordinates scales every axis by SCALE_FACTOR
+    # (the Z flip and offset don't change distances), so the 1cm threshold
+    # (lowered for slow movement) is mapped back to episode units instead
+    # of transforming every position
+    scale = abs(config.SCALE_FACTOR)
+    if scale == 0:
+        return False
+    threshold = 0.01 / scale
+    first = base_positions[0]
 
-    # Check if any frame has different base position
-    for frame in frames[1:]:
-        current_base = transform_position(frame['base']['pos'], config)
-        # Check if position changed by more than 0.01m (1cm) - lowered threshold for slow movement
-        if abs(current_base[0] - first_base[0]) > 0.01 or \
-           abs(current_base[1] - first_base[1]) > 0.01 or \
-           abs(current_base[2] - first_base[2]) > 0.01:
-            return True
+    # A moving base usually ends up elsewhere: check the last frame first
+    if np.any(np.abs(base_positions[-1] - first) > threshold):
+        return True
 
-    return False
+    return bool(np.any(np.abs(base_positions - first) > threshold))
 
 
 def visualize_episode_with_fbx(
@@ -137,7 +310,10 @@ def visualize_episode_with_fbx(
     skip_takeoff: bool = False,
     playback_speed: float = 1.0,
     fbx_asset_name: str = "TankMesh",
-    fbx_scale: float = 1.0
+    fbx_scale: float = 1.0,
+    reuse_base: bool = False,
+    reuse_markers: bool = False,
+    verbose: bool = False
 ):
     """
     Visualize episode in AirSim with FBX model for base.
@@ -151,12 +327,21 @@ def visualize_episode_with_fbx(
         playback_speed: Playback speed multiplier
         fbx_asset_name: Name of the FBX asset in Unreal
         fbx_scale: Scale factor for the FBX model
+        reuse_base: Reuse a base model left in the scene by an earlier run
+            and leave it there afterwards instead of destroying it
+        reuse_markers: Keep the markers/trajectories from the previous
+            reuse_markers run when they would be drawn identically
+        verbose: Print the path, calibration and final position debug output
     """
-    frames = episode_data['frames']
+    n_frames = episode_data['n_frames']
     metadata = episode_data['metadata']
 
-    if end_frame is None or end_frame > len(frames):
-        end_frame = len(frames)
+    if end_frame is None or end_frame > n_frames:
+        end_frame = n_frames
+
+    base_pos_arr = episode_data['base_pos']
+    if base_pos_arr is not None:
+        base_pos_arr = base_pos_arr[start_frame:end_frame]
 
     print("\n" + "="*60)
     print("STARTING VISUALIZATION WITH FBX BASE MODEL")
@@ -169,33 +354,29 @@ def visualize_episode_with_fbx(
     print(f"FBX Scale: {fbx_scale}x")
     print("="*60)
 
-    # Connect to AirSim
+    # Connect to AirSim (the connection is shared across runs in one session)
     print("\nConnecting to AirSim...")
-    client = airsim.MultirotorClient()
-    client.confirmConnection()
+    client = get_client()
     print("✓ Connected")
 
     # Check if base has moving trajectory
-    base_is_moving = check_base_trajectory(frames[start_frame:end_frame], config)
+    base_is_moving = check_base_trajectory(base_pos_arr, config)
     print(f"\nBase trajectory: {'MOVING' if base_is_moving else 'STATIONARY'}")
 
     # Get vehicle names from metadata
     vehicle_names = metadata.get('vehicle_names', ['Defender', 'Attacker'])
     print(f"\nVehicles: {', '.join(vehicle_names)}")
 
-    # Clear all old markers/trajectories from previous runs
-    print("\nClearing old visualizations...")
-    try:
-        client.simFlushPersistentMarkers()
-        print("✓ Cleared old markers")
-    except:
-        print("✓ Marker clearing not supported (old AirSim version)")
+    # Clear all old markers/trajectories from previous runs (with
+    # reuse_markers this is decided once the paths are known)
+    if not reuse_markers:
+        flush_markers(client)
+        forget_markers()
 
     # Enable API control for all vehicles
     print("\nEnabling API control...")
-    for vehicle in vehicle_names:
-        client.enableApiControl(True, vehicle)
-        client.armDisarm(True, vehicle)
+    call_for_vehicles(client, 'enableApiControl', vehicle_names, True)
+    call_for_vehicles(client, 'armDisarm', vehicle_names, True)
 
     # Takeoff if not skipped
     if not skip_takeoff:
@@ -203,15 +384,8 @@ def visualize_episode_with_fbx(
         futures = [client.takeoffAsync(vehicle_name=v) for v in vehicle_names]
         for f in futures:
             f.join()
-        print("Waiting 3 seconds after takeoff...")
-        time.sleep(3)
-
-    # Colors for visualization
-    COLOR_DEFENDER = [0.0, 1.0, 0.0, 1.0]  # Green
-    COLOR_ATTACKER = [1.0, 0.0, 0.0, 1.0]  # Red
-    COLOR_BASE = [0.0, 0.5, 1.0, 1.0]      # Cyan
-
-    colors = [COLOR_DEFENDER, COLOR_ATTACKER]
+        print("Waiting for vehicles to settle after takeoff...")
+        wait_until_settled(client, vehicle_names, timeout=3.0)
 
     fbx_object_name = None
 
@@ -219,167 +393,165 @@ def visualize_episode_with_fbx(
         # Build flight paths directly from episode data
         # Scale X/Y for horizontal distances, but NOT Z (altitude stays in meters)
         print("\nBuilding flight paths from episode data...")
-        episode_frames = frames[start_frame:end_frame]
-
-        # Build paths for drones - scale X/Y only, NOT Z
-        paths = {}
-        paths['Defender'] = []
-        paths['Attacker'] = []
-        base_path = []
-
-        for frame in episode_frames:
-            # Defender path - no flipping
-            def_pos = frame['defender']['pos']
-            paths['Defender'].append(airsim.Vector3r(
-                def_pos[0] * config.SCALE_FACTOR,   # X as-is
-                def_pos[1] * config.SCALE_FACTOR,   # Y as-is
-                def_pos[2]                           # Z NOT scaled
-            ))
-
-            # Attacker path - no flipping
-            att_pos = frame['attacker']['pos']
-            paths['Attacker'].append(airsim.Vector3r(
-                att_pos[0] * config.SCALE_FACTOR,   # X as-is
-                att_pos[1] * config.SCALE_FACTOR,   # Y as-is
-                att_pos[2]                           # Z NOT scaled
-            ))
-
-            # Base path - scale X/Y only, NOT Z
-            if 'base' in frame:
-                base_pos = frame['base']['pos']
-                base_path.append(airsim.Vector3r(
-                    base_pos[0] * config.SCALE_FACTOR,
-                    base_pos[1] * config.SCALE_FACTOR,
-                    base_pos[2]
-                ))
-
-        print(f"✓ Built paths: {len(paths['Defender'])} waypoints per drone")
-        print(f"\nTRAJECTORY DEBUG:")
-        print(f"  Defender START: ({paths['Defender'][0].x_val:.2f}, {paths['Defender'][0].y_val:.2f}, {paths['Defender'][0].z_val:.2f})")
-        print(f"  Defender END:   ({paths['Defender'][-1].x_val:.2f}, {paths['Defender'][-1].y_val:.2f}, {paths['Defender'][-1].z_val:.2f})")
-        print(f"  Attacker START: ({paths['Attacker'][0].x_val:.2f}, {paths['Attacker'][0].y_val:.2f}, {paths['Attacker'][0].z_val:.2f})")
-        print(f"  Attacker END:   ({paths['Attacker'][-1].x_val:.2f}, {paths['Attacker'][-1].y_val:.2f}, {paths['Attacker'][-1].z_val:.2f})")
+
+        # Build paths for drones - scale X/Y only, NOT Z (no flipping). Only
+        # the (N, 3) arrays are kept; points are made from them at the RPC
+        # calls, and only for the (simplified) points actually sent.
+        path_arrays = {}
+        path_arrays['Defender'] = visual_path_array(
+            episode_data['defender_pos'][start_frame:end_frame], config.SCALE_FACTOR)
+        path_arrays['Attacker'] = visual_path_array(
+            episode_data['attacker_pos'][start_frame:end_frame], config.SCALE_FACTOR)
+        start_points = {vehicle: to_path_points(arr[:1])[0] for vehicle, arr in path_arrays.items()}
+
+        # The base model is spawned at the start position; the full base path
+        # is only built when the base moves (see BasePoseThread)
+        base_start = None
+        base_path_arr = None
+        if base_pos_arr is not None:
+            if base_is_moving:
+                base_path_arr = visual_path_array(base_pos_arr, config.SCALE_FACTOR)
+                base_start = to_path_points(base_path_arr[:1])[0]
+            else:
+                base_start = to_path_points(visual_path_array(base_pos_arr[:1], config.SCALE_FACTOR))[0]
+
+        print(f"✓ Built paths: {len(path_arrays['Defender'])} waypoints per drone")
+        if verbose:
+            end_points = {vehicle: to_path_points(arr[-1:])[0] for vehicle, arr in path_arrays.items()}
+            print(f"\nTRAJECTORY DEBUG:")
+            print(f"  Defender START: ({start_points['Defender'].x_val:.2f}, {start_points['Defender'].y_val:.2f}, {start_points['Defender'].z_val:.2f})")
+            print(f"  Defender END:   ({end_points['Defender'].x_val:.2f}, {end_points['Defender'].y_val:.2f}, {end_points['Defender'].z_val:.2f})")
+            print(f"  Attacker START: ({start_points['Attacker'].x_val:.2f}, {start_points['Attacker'].y_val:.2f}, {start_points['Attacker'].z_val:.2f})")
+            print(f"  Attacker END:   ({end_points['Attacker'].x_val:.2f}, {end_points['Attacker'].y_val:.2f}, {end_points['Attacker'].z_val:.2f})")
 
         # Check actual drone positions and calculate offset
-        def_pos_actual = client.simGetVehiclePose('Defender').position
-        att_pos_actual = client.simGetVehiclePose('Attacker').position
+        def_pos_actual, att_pos_actual = get_vehicle_positions(client, ['Defender', 'Attacker'])
 
-        print(f"\nCOORDINATE SYSTEM CALIBRATION:")
-        print(f"  Defender expected (from data): ({paths['Defender'][0].x_val:.2f}, {paths['Defender'][0].y_val:.2f}, {paths['Defender'][0].z_val:.2f})")
-        print(f"  Defender actual (from AirSim):  ({def_pos_actual.x_val:.2f}, {def_pos_actual.y_val:.2f}, {def_pos_actual.z_val:.2f})")
-        print(f"  Attacker expected (from data): ({paths['Attacker'][0].x_val:.2f}, {paths['Attacker'][0].y_val:.2f}, {paths['Attacker'][0].z_val:.2f})")
-        print(f"  Attacker actual (from AirSim):  ({att_pos_actual.x_val:.2f}, {att_pos_actual.y_val:.2f}, {att_pos_actual.z_val:.2f})")
+        if verbose:
+            print(f"\nCOORDINATE SYSTEM CALIBRATION:")
+            print(f"  Defender expected (from data): ({start_points['Defender'].x_val:.2f}, {start_points['Defender'].y_val:.2f}, {start_points['Defender'].z_val:.2f})")
+            print(f"  Defender actual (from AirSim):  ({def_pos_actual.x_val:.2f}, {def_pos_actual.y_val:.2f}, {def_pos_actual.z_val:.2f})")
+            print(f"  Attacker expected (from data): ({start_points['Attacker'].x_val:.2f}, {start_points['Attacker'].y_val:.2f}, {start_points['Attacker'].z_val:.2f})")
+            print(f"  Attacker actual (from AirSim):  ({att_pos_actual.x_val:.2f}, {att_pos_actual.y_val:.2f}, {att_pos_actual.z_val:.2f})")
 
         # Calculate offset for each drone
-        def_offset_x = def_pos_actual.x_val - paths['Defender'][0].x_val
-        def_offset_y = def_pos_actual.y_val - paths['Defender'][0].y_val
-        def_offset_z = def_pos_actual.z_val - paths['Defender'][0].z_val
+        def_offset = np.array([def_pos_actual.x_val, def_pos_actual.y_val, def_pos_actual.z_val]) - path_arrays['Defender'][0]
+        att_offset = np.array([att_pos_actual.x_val, att_pos_actual.y_val, att_pos_actual.z_val]) - path_arrays['Attacker'][0]
 
-        att_offset_x = att_pos_actual.x_val - paths['Attacker'][0].x_val
-        att_offset_y = att_pos_actual.y_val - paths['Attacker'][0].y_val
-        att_offset_z = att_pos_actual.z_val - paths['Attacker'][0].z_val
-
-        print(f"\n  Defender offset: ({def_offset_x:.2f}, {def_offset_y:.2f}, {def_offset_z:.2f})")
-        print(f"  Attacker offset: ({att_offset_x:.2f}, {att_offset_y:.2f}, {att_offset_z:.2f})")
+        print(f"\n  Defender offset: ({def_offset[0]:.2f}, {def_offset[1]:.2f}, {def_offset[2]:.2f})")
+        print(f"  Attacker offset: ({att_offset[0]:.2f}, {att_offset[1]:.2f}, {att_offset[2]:.2f})")
         print(f"\n  Creating offset flight paths for drones...")
 
+        # Drop waypoints within FLIGHT_PATH_TOLERANCE of the simplified path;
+        # both the flown paths and the drawn lines use the simplified points
+        simple_arrays = {vehicle: simplify_path(arr, config.FLIGHT_PATH_TOLERANCE)
+                         for vehicle, arr in path_arrays.items()}
+
         # Create separate flight paths with offset applied (for flying)
-        flight_paths = {}
-        flight_paths['Defender'] = [airsim.Vector3r(
-            p.x_val + def_offset_x,
-            p.y_val + def_offset_y,
-            p.z_val + def_offset_z
-        ) for p in paths['Defender']]
-
-        flight_paths['Attacker'] = [airsim.Vector3r(
-            p.x_val + att_offset_x,
-            p.y_val + att_offset_y,
-            p.z_val + att_offset_z
-        ) for p in paths['Attacker']]
+        flight_arrays = {
+            'Defender': simple_arrays['Defender'] + def_offset,
+            'Attacker': simple_arrays['Attacker'] + att_offset,
+        }
+        # Only ever sent, so in the cheaper-to-pack dict form
+        flight_paths = {vehicle: to_wire_points(arr) for vehicle, arr in flight_arrays.items()}
 
         print(f"  ✓ Flight paths adjusted to AirSim coordinate system")
-        print(f"  Flight path Defender start: ({flight_paths['Defender'][0].x_val:.2f}, {flight_paths['Defender'][0].y_val:.2f}, {flight_paths['Defender'][0].z_val:.2f})")
-        print(f"  Flight path Attacker start: ({flight_paths['Attacker'][0].x_val:.2f}, {flight_paths['Attacker'][0].y_val:.2f}, {flight_paths['Attacker'][0].z_val:.2f})")
+        for vehicle in flight_paths:
+            print(f"  {vehicle} waypoints: {len(path_arrays[vehicle])} -> {len(flight_paths[vehicle])} "
+                  f"(within {config.FLIGHT_PATH_TOLERANCE}m)")
+        if verbose:
+            print(f"  Flight path Defender start: ({flight_paths['Defender'][0]['x_val']:.2f}, {flight_paths['Defender'][0]['y_val']:.2f}, {flight_paths['Defender'][0]['z_val']:.2f})")
+            print(f"  Flight path Attacker start: ({flight_paths['Attacker'][0]['x_val']:.2f}, {flight_paths['Attacker'][0]['y_val']:.2f}, {flight_paths['Attacker'][0]['z_val']:.2f})")
 
         # Spawn FBX model at base starting location
-        if base_path:
-            base_start = base_path[0]
+        if base_start is not None:
             print(f"\n{'='*60}")
             print(f"SPAWNING FBX BASE MODEL")
             print(f"{'='*60}")
             print(f"Position: ({base_start.x_val:.3f}, {base_start.y_val:.3f}, 0.0)")
-            fbx_object_name = spawn_fbx_model(client, base_start, fbx_asset_name, fbx_scale)
+            fbx_object_name = spawn_fbx_model(client, base_start, fbx_asset_name, fbx_scale, reuse=reuse_base)
             print(f"{'='*60}\n")
 
         # Draw persistent starting markers and trajectory lines
-        print("\nDrawing position markers and trajectories...")
-
-        # DEFENDER starting marker (green sphere)
-        def_start = paths['Defender'][0]
-        client.simPlotPoints(
-            points=[def_start],
-            color_rgba=[0.0, 1.0, 0.0, 1.0],  # Green
-            size=25.0,
-            duration=9999.0,
-            is_persistent=True
-        )
-        try:
-            client.simPlotStrings(
-                strings=["DEFENDER"],
-                positions=[airsim.Vector3r(def_start.x_val, def_start.y_val, def_start.z_val - 2.0)],
-                scale=5.0,
-                color_rgba=[0.0, 1.0, 0.0, 1.0],
-                duration=9999.0
-            )
-            print(f"  ✓ DEFENDER (green) at: ({def_start.x_val:.2f}, {def_start.y_val:.2f}, {def_start.z_val:.2f}) [text shown]")
-        except Exception as e:
-            print(f"  ✓ DEFENDER (green) at: ({def_start.x_val:.2f}, {def_start.y_val:.2f}, {def_start.z_val:.2f}) [text not supported]")
-
-        # ATTACKER starting marker (red sphere)
-        att_start = paths['Attacker'][0]
-        client.simPlotPoints(
-            points=[att_start],
-            color_rgba=[1.0, 0.0, 0.0, 1.0],  # Red
-            size=25.0,
-            duration=9999.0,
-            is_persistent=True
-        )
-        try:
-            client.simPlotStrings(
-                strings=["ATTACKER"],
-                positions=[airsim.Vector3r(att_start.x_val, att_start.y_val, att_start.z_val - 2.0)],
-                scale=5.0,
-                color_rgba=[1.0, 0.0, 0.0, 1.0],
-                duration=9999.0
-            )
-            print(f"  ✓ ATTACKER (red) at: ({att_start.x_val:.2f}, {att_start.y_val:.2f}, {att_start.z_val:.2f}) [text shown]")
-        except Exception as e:
-            print(f"  ✓ ATTACKER (red) at: ({att_start.x_val:.2f}, {att_start.y_val:.2f}, {att_start.z_val:.2f}) [text not supported]")
+        # Persistent debug drawing slows Unreal's render thread, so each
+        # part is skipped entirely when disabled (--no-markers / --no-trajectories)
+        show_markers = config.SHOW_VEHICLE_MARKERS
+        show_lines = config.SHOW_TRAJECTORIES
+
+        # With reuse_markers, markers identical to the last run's are left
+        # in place instead of being flushed and uploaded again
+        marker_digest = None
+        if reuse_markers:
+            marker_digest = markers_digest(simple_arrays, show_markers, show_lines,
+                                           config.TRAJECTORY_THICKNESS, config.TRAJECTORY_MAX_DRAW_POINTS)
+            try:
+                previous_digest = MARKER_DIGEST_FILE.read_text()
+            except OSError:
+                previous_digest = None
+            if marker_digest == previous_digest:
+                marker_digest = None
+                show_markers = show_lines = False
+                print("\n✓ Markers and trajectories unchanged since the last run (not redrawn)")
+            else:
+                flush_markers(client)
+                print()
+
+        if show_markers or show_lines:
+            print("\nDrawing position markers and trajectories...")
+        elif not reuse_markers or marker_digest is not None:
+            print("\nSkipping position markers and trajectories (disabled)")
+
+        # Starting marker (sphere + label) and trajectory line per drone,
+        # drawn from the SAME paths the drones will fly (lines downsampled
+        # for drawing only on long episodes). One color per call, so each
+        # is its own request, but all are sent before any reply is awaited.
+        rpc = client.client
+        pending = []
+        for vehicle, color_name, color in (("Defender", "green", COLOR_DEFENDER),
+                                           ("Attacker", "red", COLOR_ATTACKER)):
+            start = start_points[vehicle]
+            f_point = f_text = f_line = None
+            if show_markers:
+                f_point = rpc.call_async('simPlotPoints', [start], color, 25.0, 9999.0, True)
+                f_text = rpc.call_async(
+                    'simPlotStrings',
+                    [vehicle.upper()],
+                    [airsim.Vector3r(start.x_val, start.y_val, start.z_val - 2.0)],
+                    5.0,
+                    color,
+                    9999.0
+                )
+            if show_lines:
+                line = downsample_points(to_wire_points(simple_arrays[vehicle]), config.TRAJECTORY_MAX_DRAW_POINTS)
+                f_line = rpc.call_async('simPlotLineStrip', line, color, config.TRAJECTORY_THICKNESS, 9999.0, True)
+            pending.append((vehicle, color_name, start, f_point, f_text, f_line))
+
+        for vehicle, color_name, start, f_point, f_text, f_line in pending:
+            if f_point is None:
+                continue
+            f_point.get()
+            try:
+                f_text.get()
+                text_status = "text shown"
+            except Exception as e:
+                text_status = "text not supported"
+            print(f"  ✓ {vehicle.upper()} ({color_name}) at: ({start.x_val:.2f}, {start.y_val:.2f}, {start.z_val:.2f}) [{text_status}]")
 
-        # Draw trajectory lines using the SAME paths the drones will fly
-        try:
-            client.simPlotLineStrip(
-                points=paths['Defender'],
-                color_rgba=[0.0, 1.0, 0.0, 1.0],  # Green
-                thickness=5.0,
-                duration=9999.0,
-                is_persistent=True
-            )
-            print(f"  ✓ DEFENDER trajectory (green) - {len(paths['Defender'])} waypoints")
-        except Exception as e:
-            print(f"  ✗ Failed to draw DEFENDER trajectory: {e}")
+        for vehicle, color_name, _, _, _, f_line in pending:
+            if f_line is None:
+                continue
+            try:
+                f_line.get()
+                print(f"  ✓ {vehicle.upper()} trajectory ({color_name}) - {len(path_arrays[vehicle])} waypoints")
+            except Exception as e:
+                print(f"  ✗ Failed to draw {vehicle.upper()} trajectory: {e}")
 
-        try:
-            client.simPlotLineStrip(
-                points=paths['Attacker'],
-                color_rgba=[1.0, 0.0, 0.0, 1.0],  # Red
-                thickness=5.0,
-                duration=9999.0,
-                is_persistent=True
-            )
-            print(f"  ✓ ATTACKER trajectory (red) - {len(paths['Attacker'])} waypoints")
-        except Exception as e:
-            print(f"  ✗ Failed to draw ATTACKER trajectory: {e}")
+        # Remember what is now in the scene for the next reuse_markers run
+        if marker_digest is not None:
+            try:
+                MARKER_DIGEST_FILE.write_text(marker_digest)
+            except OSError:
+                pass
 
         print()
 
@@ -387,21 +559,10 @@ def visualize_episode_with_fbx(
         print("SMOOTH FLIGHT ALONG TRAJECTORIES")
         print("="*60)
 
-        # Calculate path lengths
-        def calculate_path_length(path):
-            if len(path) < 2:
-                return 0.0
-            total = 0.0
-            for i in range(1, len(path)):
-                p1, p2 = path[i-1], path[i]
-                total += ((p2.x_val - p1.x_val)**2 +
-                         (p2.y_val - p1.y_val)**2 +
-                         (p2.z_val - p1.z_val)**2)**0.5
-            return total
-
+        # Calculate path lengths (sum of segment lengths)
         path_lengths = {}
         for vehicle in vehicle_names:
-            path_lengths[vehicle] = calculate_path_length(paths[vehicle])
+            path_lengths[vehicle] = float(np.linalg.norm(np.diff(path_arrays[vehicle], axis=0), axis=1).sum())
             print(f"{vehicle} path length: {path_lengths[vehicle]:.2f}m")
 
         # Calculate adaptive velocities so all drones finish at the same time
@@ -428,7 +589,7 @@ def visualize_episode_with_fbx(
         for vehicle in vehicle_names:
             print(f"  {vehicle} velocity: {velocities[vehicle]:.3f} m/s (path: {path_lengths[vehicle]:.2f}m)")
         print(f"  Note: Defender flies 1.1x faster")
-        print(f"  Total waypoints: {len(paths[vehicle_names[0]])}\n")
+        print(f"  Total waypoints: {len(path_arrays[vehicle_names[0]])}\n")
 
         # Start smooth flight for all drones using offset flight paths with adaptive velocities
         print("Starting smooth flight...")
@@ -439,8 +600,8 @@ def visualize_episode_with_fbx(
                     path=flight_paths[vehicle],
                     velocity=velocities[vehicle],  # Use adaptive velocity per drone
                     timeout_sec=estimated_duration * 2,
-                    drivetrain=airsim.DrivetrainType.MaxDegreeOfFreedom,
-                    yaw_mode=airsim.YawMode(is_rate=False, yaw_or_rate=0),
+                    drivetrain=PATH_DRIVETRAIN,
+                    yaw_mode=PATH_YAW_MODE,
                     lookahead=-1,
                     adaptive_lookahead=1,
                     vehicle_name=vehicle
@@ -452,54 +613,68 @@ def visualize_episode_with_fbx(
         print("\nDrones are flying along trajectories...")
         print("(This may take a while - AirSim controls the actual speed)\n")
 
-        for vehicle, f in drone_futures:
-            try:
-                f.join()
-                print(f"  ✓ {vehicle} completed trajectory")
-            except Exception as e:
-                print(f"  ⚠ {vehicle}: {e}")
-
-        # Check final positions
-        print(f"\nFINAL POSITION DEBUG:")
-        def_final_actual = client.simGetVehiclePose('Defender').position
-        att_final_actual = client.simGetVehiclePose('Attacker').position
-        print(f"  Defender ACTUAL end: ({def_final_actual.x_val:.2f}, {def_final_actual.y_val:.2f}, {def_final_actual.z_val:.2f})")
-        print(f"  Defender EXPECTED end: ({flight_paths['Defender'][-1].x_val:.2f}, {flight_paths['Defender'][-1].y_val:.2f}, {flight_paths['Defender'][-1].z_val:.2f})")
-        print(f"  Attacker ACTUAL end: ({att_final_actual.x_val:.2f}, {att_final_actual.y_val:.2f}, {att_final_actual.z_val:.2f})")
-        print(f"  Attacker EXPECTED end: ({flight_paths['Attacker'][-1].x_val:.2f}, {flight_paths['Attacker'][-1].y_val:.2f}, {flight_paths['Attacker'][-1].z_val:.2f})")
-
-        # Calculate end distances
-        def_end_dist = ((def_final_actual.x_val - flight_paths['Defender'][-1].x_val)**2 +
-                        (def_final_actual.y_val - flight_paths['Defender'][-1].y_val)**2 +
-                        (def_final_actual.z_val - flight_paths['Defender'][-1].z_val)**2)**0.5
-        att_end_dist = ((att_final_actual.x_val - flight_paths['Attacker'][-1].x_val)**2 +
-                        (att_final_actual.y_val - flight_paths['Attacker'][-1].y_val)**2 +
-                        (att_final_actual.z_val - flight_paths['Attacker'][-1].z_val)**2)**0.5
-        print(f"\nDISTANCE from final drone position to last trajectory waypoint:")
-        print(f"  Defender: {def_end_dist:.3f}m")
-        print(f"  Attacker: {att_end_dist:.3f}m")
+        # Move the base model along its path on its own thread meanwhile
+        base_thread = None
+        if fbx_object_name and base_path_arr is not None:
+            base_thread = BasePoseThread(fbx_object_name, base_path_arr, estimated_duration)
+            base_thread.start()
+            print(f"  ✓ Base model following its path ({len(base_path_arr)} positions)")
+
+        try:
+            for vehicle, f in drone_futures:
+                try:
+                    f.join()
+                    print(f"  ✓ {vehicle} completed trajectory")
+                except Exception as e:
+                    print(f"  ⚠ {vehicle}: {e}")
+        finally:
+            if base_thread is not None:
+                base_thread.stop()
+
+        # Check final positions (an extra pose query, so only when verbose)
+        if verbose:
+            print(f"\nFINAL POSITION DEBUG:")
+            def_final_actual, att_final_actual = get_vehicle_positions(client, ['Defender', 'Attacker'])
+            print(f"  Defender ACTUAL end: ({def_final_actual.x_val:.2f}, {def_final_actual.y_val:.2f}, {def_final_actual.z_val:.2f})")
+            print(f"  Defender EXPECTED end: ({flight_paths['Defender'][-1]['x_val']:.2f}, {flight_paths['Defender'][-1]['y_val']:.2f}, {flight_paths['Defender'][-1]['z_val']:.2f})")
+            print(f"  Attacker ACTUAL end: ({att_final_actual.x_val:.2f}, {att_final_actual.y_val:.2f}, {att_final_actual.z_val:.2f})")
+            print(f"  Attacker EXPECTED end: ({flight_paths['Attacker'][-1]['x_val']:.2f}, {flight_paths['Attacker'][-1]['y_val']:.2f}, {flight_paths['Attacker'][-1]['z_val']:.2f})")
+
+            # Calculate end distances for both drones in one pass
+            final_actual = np.array([
+                [def_final_actual.x_val, def_final_actual.y_val, def_final_actual.z_val],
+                [att_final_actual.x_val, att_final_actual.y_val, att_final_actual.z_val]
+            ])
+            final_expected = np.array([flight_arrays['Defender'][-1], flight_arrays['Attacker'][-1]])
+            def_end_dist, att_end_dist = np.linalg.norm(final_actual - final_expected, axis=1).tolist()
+            print(f"\nDISTANCE from final drone position to last trajectory waypoint:")
+            print(f"  Defender: {def_end_dist:.3f}m")
+            print(f"  Attacker: {att_end_dist:.3f}m")
 
         print("\n" + "="*60)
         print("PLAYBACK COMPLETE")
         print("="*60)
 
-        print("\nWaiting 3 seconds before landing...")
-        time.sleep(3)
+        print("\nWaiting for vehicles to settle before landing...")
+        wait_until_settled(client, vehicle_names, timeout=3.0)
 
     except KeyboardInterrupt:
         print("\n\n⚠️  Visualization interrupted by user")
     except Exception as e:
         print(f"\n\n⚠️  ERROR during visualization: {e}")
-        import traceback
-        traceback.print_exc()
+        if verbose:
+            import traceback
+            traceback.print_exc()
+        else:
+            print("   (run with --verbose for the full traceback)")
     finally:
-        # Clean up FBX object
-        if fbx_object_name:
+        # Clean up FBX object (kept for the next run with --reuse-base)
+        if fbx_object_name and not reuse_base:
             try:
                 print(f"\nCleaning up FBX model...")
                 client.simDestroyObject(fbx_object_name)
                 print(f"✓ FBX model removed")
-            except:
+            except Exception:
                 pass
 
         # Land and disarm drones
@@ -511,17 +686,16 @@ def visualize_episode_with_fbx(
 
             # Wait for landing to complete
             print("Waiting for landing to complete...")
-            time.sleep(3)
+            wait_until_landed(client, vehicle_names, timeout=3.0)
 
-            for vehicle in vehicle_names:
-                client.armDisarm(False, vehicle)
-                client.enableApiControl(False, vehicle)
+            call_for_vehicles(client, 'armDisarm', vehicle_names, False)
+            call_for_vehicles(client, 'enableApiControl', vehicle_names, False)
             print("✓ Vehicles landed and disarmed")
         except Exception as e:
             print(f"⚠️  Could not land properly: {e}")
             try:
                 client.reset()
-            except:
+            except Exception:
                 pass
 
 
@@ -619,6 +793,26 @@ Examples:
         help='Scale factor for the FBX model (default: 1.0)'
     )
 
+    parser.add_argument(
+        '--reuse-base',
+        action='store_true',
+        help='Reuse the FBX base model from a previous run and leave it in the scene afterwards'
+    )
+
+    parser.add_argument(
+        '--reuse-markers',
+        action='store_true',
+        help='Skip redrawing markers/trajectories identical to the previous --reuse-markers run '
+             'in the same Unreal session. If settings.json is unchanged the Unreal restart step '
+             'is skipped to keep that session; a restart clears the record'
+    )
+
+    parser.add_argument(
+        '-v', '--verbose',
+        action='store_true',
+        help='Print path, calibration and final position debug output'
+    )
+
     parser.add_argument(
         '--keep-converted',
         action='store_true',
@@ -651,34 +845,30 @@ Examples:
     # Step 1: Convert waypoints to episode format
     print("Step 1: Converting waypoints to episode format...")
 
+    # The converted episode stays in memory; it only goes to disk if asked to
     if args.output_converted:
         converted_path = args.output_converted
-        keep_converted = True
     elif args.keep_converted:
         converted_path = str(waypoints_path.parent / f"{waypoints_path.stem}_converted.json")
-        keep_converted = True
     else:
-        temp_fd, converted_path = tempfile.mkstemp(suffix='.json', prefix='airsim_episode_')
-        os.close(temp_fd)
-        keep_converted = False
+        converted_path = None
 
     try:
-        convert_waypoints_to_episode(str(waypoints_path), converted_path)
+        converted = convert_waypoints_to_episode_dict(str(waypoints_path))
+        if converted_path is not None:
+            write_episode_json(converted['metadata'], converted['frames'], converted_path)
     except Exception as e:
         print(f"\n⚠️  ERROR during conversion: {e}")
-        if not keep_converted:
-            os.unlink(converted_path)
         sys.exit(1)
 
-    # Step 2: Load converted episode
+    # Step 2: Pack converted episode
     print("\nStep 2: Loading converted episode...")
     try:
-        episode_data = load_episode(converted_path)
+        episode_data = episode_from_dict(converted)
     except Exception as e:
         print(f"\n⚠️  ERROR loading converted episode: {e}")
-        if not keep_converted:
-            os.unlink(converted_path)
         sys.exit(1)
+    del converted
 
     # Step 3: Auto-configure
     print("\nStep 3: Auto-configuring from episode metadata...")
@@ -698,18 +888,28 @@ Examples:
 
     # Step 4: Update settings.json
     print("\nStep 4: Updating AirSim settings.json...")
-    update_settings_with_frame_0(episode_data, config, args.settings_path)
+    settings_changed = update_settings_with_frame_0(episode_data, config, args.settings_path)
 
-    print("\n" + "="*60)
-    print("⚠️  IMPORTANT: You MUST restart Unreal Engine now!")
-    print("="*60)
-    print("1. Close Unreal Engine completely")
-    print("2. Restart Unreal Engine")
-    print("3. Press Play in Unreal")
-    print("4. Come back here and press ENTER")
-    print("="*60)
+    if args.reuse_markers and not settings_changed:
+        # Same spawn positions: keep the running Unreal session, whose
+        # markers the last run's fingerprint still describes
+        print("\n✓ settings.json unchanged - skipping the Unreal restart (--reuse-markers)")
+        print("  Unreal must still be running with Play pressed")
+    else:
+        print("\n" + "="*60)
+        print("⚠️  IMPORTANT: You MUST restart Unreal Engine now!")
+        print("="*60)
+        print("1. Close Unreal Engine completely")
+        print("2. Restart Unreal Engine")
+        print("3. Press Play in Unreal")
+        print("4. Come back here and press ENTER")
+        print("="*60)
+
+        # The restart clears every marker, so the last run's fingerprint no
+        # longer describes the scene and this run has to draw its own
+        forget_markers()
 
-    input("\nPress ENTER after you've restarted Unreal and pressed Play...")
+        input("\nPress ENTER after you've restarted Unreal and pressed Play...")
 
     print("\nStep 5: Running visualization with FBX model...")
     try:
@@ -721,25 +921,28 @@ Examples:
             skip_takeoff=args.no_takeoff,
             playback_speed=args.speed,
             fbx_asset_name=args.fbx_asset,
-            fbx_scale=args.fbx_scale
+            fbx_scale=args.fbx_scale,
+            reuse_base=args.reuse_base,
+            reuse_markers=args.reuse_markers,
+            verbose=args.verbose
         )
 
         print("\n✓ Visualization complete!")
 
-        if keep_converted:
+        if converted_path is not None:
             print(f"\n✓ Converted episode saved to: {converted_path}")
 
     except KeyboardInterrupt:
         print("\n\n⚠️  Visualization interrupted by user")
     except Exception as e:
         print(f"\n⚠️  ERROR: {e}")
-        import traceback
-        traceback.print_exc()
+        if args.verbose:
+            import traceback
+            traceback.print_exc()
+        else:
+            print("   (run with --verbose for the full traceback)")
     finally:
-        # Clean up temporary file if not keeping
-        if not keep_converted and os.path.exists(converted_path):
-            os.unlink(converted_path)
-            print(f"\n✓ Cleaned up temporary converted file")
+        release_client()
 
 
 if __name__ == "__main__":
@@ -22,16 +22,15 @@ Date: 2025
 
 import sys
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import tempfile
 import os
 
 # Add scripts directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from convert_waypoints_to_episode import convert_waypoints_to_episode
-from visualize_episode import visualize_episode, update_settings_with_frame_0, load_episode
-from config import VisualizationConfig, print_config_summary, auto_configure_from_metadata
+# The pipeline modules (numpy, the airsim client) are imported in main()
+# once the arguments are valid, so --help and usage errors return at once
 
 
 def main():
@@ -53,8 +52,14 @@ Examples:
   # Skip takeoff (if drones already airborne)
   python visualize_waypoints.py ../data/episodes/episode_0001_airsim.json --no-takeoff
 
+  # Keep a binary cache of the converted episode next to the waypoints (faster reruns)
+  python visualize_waypoints.py ../data/episodes/episode_0001_airsim.json --cache
+
   # Keep converted episode file
   python visualize_waypoints.py ../data/episodes/episode_0001_airsim.json --keep-converted
+
+  # Profile the run (view with: snakeviz waypoints.prof)
+  python visualize_waypoints.py ../data/episodes/episode_0001_airsim.json --profile waypoints.prof
         """
     )
 
@@ -130,14 +135,74 @@ Examples:
         help='Custom path for converted episode file (implies --keep-converted)'
     )
 
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help='Read/write a <file>.json.episode.npz cache beside the waypoints, so later runs skip the conversion'
+    )
+
+    parser.add_argument(
+        '--profile',
+        type=str,
+        default=None,
+        metavar='PATH',
+        help='Run under cProfile and write the stats to PATH (pstats format)'
+    )
+
     args = parser.parse_args()
 
+    if args.profile is None:
+        run_pipeline(args)
+        return
+
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(run_pipeline, args)
+    finally:
+        profiler.dump_stats(args.profile)
+        print(f"\n✓ Profile written to: {args.profile}")
+
+
+def run_pipeline(args):
+    """
+    Run the conversion and visualization pipeline.
+
+    Args:
+        args: Parsed command line arguments (see main)
+    """
     # Validate input file
     waypoints_path = Path(args.waypoints_file)
-    if not waypoints_path.exists():
+    try:
+        # Taken before the file is read, so it also identifies the cache source
+        source_stat = waypoints_path.stat()
+    except FileNotFoundError:
         print(f"\n⚠️  ERROR: Waypoints file not found: {args.waypoints_file}")
         sys.exit(1)
 
+    # Catch bad options here, not after the Unreal restart prompt
+    if args.speed <= 0:
+        print(f"\n⚠️  ERROR: --speed must be positive (got {args.speed})")
+        sys.exit(1)
+
+    # settings.json is replaced atomically, so its directory (or the first
+    # existing parent, which mkdir will create it in) must be writable
+    settings_dir = Path(args.settings_path).expanduser().parent
+    while not settings_dir.exists() and settings_dir != settings_dir.parent:
+        settings_dir = settings_dir.parent
+    if not os.access(settings_dir, os.W_OK):
+        print(f"\n⚠️  ERROR: Cannot write AirSim settings in: {settings_dir}")
+        sys.exit(1)
+
+    from convert_waypoints_to_episode import (
+        CONVERTER_VERSION, convert_waypoints_to_episode_dict, write_episode_json
+    )
+    from visualize_episode import (
+        visualize_episode, update_settings_with_frame_0, episode_from_dict,
+        load_episode_cache, save_episode_cache, print_episode_summary
+    )
+    from config import VisualizationConfig, print_config_summary, auto_configure_from_metadata
+
     print("\n" + "="*60)
     print("AIRSIM WAYPOINT VISUALIZATION PIPELINE")
     print("="*60)
@@ -147,35 +212,66 @@ Examples:
     # Step 1: Convert waypoints to episode format
     print("Step 1: Converting waypoints to episode format...")
 
+    # The converted episode stays in memory; it only goes to disk if asked to
     if args.output_converted:
         converted_path = args.output_converted
-        keep_converted = True
     elif args.keep_converted:
         # Save next to original with _converted suffix
         converted_path = str(waypoints_path.parent / f"{waypoints_path.stem}_converted.json")
-        keep_converted = True
     else:
-        # Use temporary file
-        temp_fd, converted_path = tempfile.mkstemp(suffix='.json', prefix='airsim_episode_')
-        os.close(temp_fd)
-        keep_converted = False
-
-    try:
-        convert_waypoints_to_episode(str(waypoints_path), converted_path)
-    except Exception as e:
-        print(f"\n⚠️  ERROR during conversion: {e}")
-        if not keep_converted:
-            os.unlink(converted_path)
+        converted_path = None
+
+    # With --cache: packed episode from an earlier run on the same file, in
+    # load_episode's .npz sidecar format. Tied to the file's mtime/size and
+    # to the converter version. Not used when the converted JSON has to be
+    # written.
+    cache_path = waypoints_path.with_name(waypoints_path.name + '.episode.npz')
+    cached = None
+    write_future = None
+    if converted_path is None and args.cache:
+        cached = load_episode_cache(waypoints_path, source_stat, cache_path, CONVERTER_VERSION)
+
+    if cached is not None:
+        print(f"  (from cache {cache_path.name})")
+        print("\nStep 2: Loading converted episode...")
+        metadata, episode_data = cached
+        episode_data['metadata'] = metadata
+        print_episode_summary(episode_data)
+    else:
+        try:
+            converted = convert_waypoints_to_episode_dict(str(waypoints_path))
+        except Exception as e:
+            print(f"\n⚠️  ERROR during conversion: {e}")
+            sys.exit(1)
+
+        if converted_path is not None:
+            # Written in the background while the episode is packed and
+            # settings.json is updated; joined before the Unreal prompt
+            executor = ThreadPoolExecutor(max_workers=1)
+            write_future = executor.submit(
+                write_episode_json, converted['metadata'], converted['frames'], converted_path)
+            executor.shutdown(wait=False)
+
+        # Step 2: Pack converted episode
+        print("\nStep 2: Loading converted episode...")
+        try:
+            episode_data = episode_from_dict(converted)
+        except Exception as e:
+            print(f"\n⚠️  ERROR loading converted episode: {e}")
+            sys.exit(1)
+        del converted
+
+        if args.cache:
+            save_episode_cache(waypoints_path, source_stat, episode_data['metadata'], episode_data,
+                               cache_path, CONVERTER_VERSION)
+
+    # end_frame past the last frame is clamped by visualize_episode
+    n_frames = episode_data['n_frames']
+    if not 0 <= args.start_frame < n_frames:
+        print(f"\n⚠️  ERROR: --start-frame must be in [0, {n_frames - 1}] (got {args.start_frame})")
         sys.exit(1)
-
-    # Step 2: Load converted episode
-    print("\nStep 2: Loading converted episode...")
-    try:
-        episode_data = load_episode(converted_path)
-    except Exception as e:
-        print(f"\n⚠️  ERROR loading converted episode: {e}")
-        if not keep_converted:
-            os.unlink(converted_path)
+    if args.end_frame is not None and args.end_frame <= args.start_frame:
+        print(f"\n⚠️  ERROR: --end-frame ({args.end_frame}) must be greater than --start-frame ({args.start_frame})")
         sys.exit(1)
 
     # Step 3: Auto-configure based on metadata
@@ -198,6 +294,13 @@ Examples:
     print("Step 4: Updating AirSim settings.json with scaled positions...")
     update_settings_with_frame_0(episode_data, config, args.settings_path)
 
+    if write_future is not None:
+        try:
+            write_future.result()
+        except Exception as e:
+            print(f"\n⚠️  ERROR writing converted episode: {e}")
+            sys.exit(1)
+
     print("\n" + "="*60)
     print("⚠️  IMPORTANT: You MUST restart Unreal Engine now!")
     print("="*60)
@@ -222,7 +325,7 @@ Examples:
 
         print("\n✓ Visualization complete!")
 
-        if keep_converted:
+        if converted_path is not None:
             print(f"\n✓ Converted episode saved to: {converted_path}")
 
     except KeyboardInterrupt:
@@ -231,11 +334,6 @@ Examples:
         print(f"\n⚠️  ERROR: {e}")
         import traceback
         traceback.print_exc()
-    finally:
-        # Clean up temporary file if not keeping
-        if not keep_converted and os.path.exists(converted_path):
-            os.unlink(converted_path)
-            print(f"\n✓ Cleaned up temporary converted file")
 
 
 if __name__ == "__main__":